@@ -1,6 +1,45 @@
 from django.contrib import admin
 from .models import *
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+# -----------------------
+# Paginator for big tables
+# -----------------------
+class EstimatedCountPaginator(Paginator):
+    """
+    On PostgreSQL, an unfiltered changelist of a large table uses the planner's
+    row estimate (pg_class.reltuples) instead of a full COUNT(*).
+    Filtered changelists, small tables and other databases count exactly.
+    """
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where:
+            connection = connections[queryset.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                        [connection.ops.quote_name(queryset.model._meta.db_table)],
+                    )
+                    row = cursor.fetchone()
+                if row and row[0] >= self.estimate_threshold:
+                    return row[0]
+        return Paginator.count.func(self)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables that grow without bound."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # skips the second, unfiltered COUNT(*) when filtering
+    list_per_page = 50
 
 # -----------------------
 # Custom User Admin
@@ -38,13 +77,20 @@ class CustomRole(admin.ModelAdmin):
 
 class CustomCategory(admin.ModelAdmin):
     list_display = ('id', 'category_name', 'created_user', 'created_date', 'updated_date')
+    list_select_related = ('created_user',)
+    search_fields = ('category_name',)
+    autocomplete_fields = ('created_user',)
 
 class CustomItem(admin.ModelAdmin):
     list_display = ('id', 'category', 'created_user', 'item_name', 'item_price', 'created_date', 'updated_date')
+    list_select_related = ('category', 'created_user')
+    search_fields = ('item_name',)
+    autocomplete_fields = ('category', 'created_user')
     inlines = [ItemPriceHistoryInline]
 
 class CustomItemPriceHistory(admin.ModelAdmin):
     list_display = ('id', 'item', 'price', 'date')
+    list_select_related = ('item',)
     readonly_fields = ('item', 'price', 'date')
 
 # -----------------------
@@ -60,50 +106,96 @@ admin.site.register(ItemPriceHistory, CustomItemPriceHistory)
 # Order
 # -----------------------
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     list_display = ('id', 'created_user', 'calculated_price', 'created_date', 'updated_date')
+    list_select_related = ('created_user',)
     search_fields = ('created_user__username', 'id')
-    list_filter = ('created_date', 'updated_date')
+    list_filter = ('created_date',)
+    date_hierarchy = 'created_date'
+    autocomplete_fields = ('created_user',)
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
-    list_display = ('id', 'order', 'item', 'count', 'added_date')
+class OrderItemAdmin(LargeTableAdmin):
+    list_display = ('id', 'order', 'item', 'total_count', 'added_date')
+    # Order.__str__ reads created_user
+    list_select_related = ('order__created_user', 'item')
     search_fields = ('order__id', 'item__item_name')
     list_filter = ('added_date',)
+    date_hierarchy = 'added_date'
+    raw_id_fields = ('order',)
+    autocomplete_fields = ('item',)
 
 # -----------------------
 # Expense & Bill
 # -----------------------
 @admin.register(Expense)
-class ExpenseAdmin(admin.ModelAdmin):
+class ExpenseAdmin(LargeTableAdmin):
     list_display = ('id', 'user', 'date', 'description', 'expense_type', 'amount', 'is_verified', 'is_refunded', 'created_date', 'updated_date')
+    list_select_related = ('user',)
     search_fields = ('user__username', 'description', 'expense_type')
     list_filter = ('expense_type', 'created_date', 'is_verified', 'is_refunded')
+    date_hierarchy = 'date'
+    autocomplete_fields = ('user',)
 
 @admin.register(Bill)
 class BillAdmin(admin.ModelAdmin):
     list_display = ('id', 'expense', 'uploaded_date')
+    list_select_related = ('expense__user',)
     search_fields = ('expense__id',)
+    raw_id_fields = ('expense',)
 
 # -----------------------
 # Transactions
 # -----------------------
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(LargeTableAdmin):
     list_display = ('id', 'user', 'total_price', 'status', 'from_date', 'to_date', 'created_date')
+    list_select_related = ('user',)
     search_fields = ('user__username', 'status')
     list_filter = ('status', 'created_date')
+    autocomplete_fields = ('user',)
 
 @admin.register(TransactionOrder)
-class TransactionOrderAdmin(admin.ModelAdmin):
+class TransactionOrderAdmin(LargeTableAdmin):
     list_display = ('id', 'transaction', 'expense', 'order_id', 'created_date')
+    list_select_related = ('transaction', 'expense__user', 'order_id__created_user')
     search_fields = ('transaction__id', 'expense__id', 'order_id__id')
+    raw_id_fields = ('transaction', 'expense', 'order_id')
 
 # -----------------------
 # Notification
 # -----------------------
+@admin.register(NotificationTemplate)
+class NotificationTemplateAdmin(admin.ModelAdmin):
+    list_display = ('key', 'text', 'updated_date')
+    search_fields = ('key',)
+
+
+@admin.register(NotificationEvent)
+class NotificationEventAdmin(LargeTableAdmin):
+    list_display = ('id', 'template_key', 'actor', 'expense', 'message', 'created_date')
+    list_select_related = ('actor',)
+    search_fields = ('actor__username', 'template_key')
+    list_filter = ('template_key',)
+    date_hierarchy = 'created_date'
+    raw_id_fields = ('actor', 'expense')
+
+
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user', 'recipient', 'expense', 'message', 'is_read', 'created_date')
-    search_fields = ('user__username', 'recipient__username', 'message')
+class NotificationAdmin(LargeTableAdmin):
+    list_display = ('id', 'recipient', 'event', 'message', 'is_read', 'created_date')
+    list_select_related = ('recipient', 'event')
+    search_fields = ('recipient__username', 'event__template_key')
     list_filter = ('is_read', 'created_date')
+    date_hierarchy = 'created_date'
+    autocomplete_fields = ('recipient',)
+    raw_id_fields = ('event',)
+
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(LargeTableAdmin):
+    list_display = ('id', 'original_id', 'recipient', 'message', 'is_read', 'created_date', 'archived_date')
+    list_select_related = ('recipient', 'event')
+    search_fields = ('recipient__username',)
+    date_hierarchy = 'created_date'
+    raw_id_fields = ('event', 'recipient')
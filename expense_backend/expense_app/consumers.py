@@ -1,23 +1,131 @@
 # expense_app/consumers.py
+import asyncio
 import json
+import time
+from urllib.parse import parse_qs
+
+from django.conf import settings
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 
+from . import notifications
+from .serializers import NotificationSerializer
+
+
+def _cursor(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+@database_sync_to_async
+def _missed_page(user, after, limit):
+    return NotificationSerializer(notifications.missed_since(user, after, limit), many=True).data
+
+
 class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    Live notifications for the connected user.
+
+    The user comes from ws_auth.JWTAuthMiddleware; the socket is closed with
+    code 4001 when the access token expires, so the client reconnects with a
+    fresh one.
+
+    A reconnecting client passes the last id it saw (ws/notifications/?after=<id>,
+    or later {"type": "replay", "after": <id>}); the missed rows are sent first,
+    NOTIFICATION_REPLAY_BATCH_SIZE per "replay" frame, followed by "replay_done".
+    Live events queued meanwhile are delivered afterwards, skipping ones already
+    replayed. Past NOTIFICATION_REPLAY_MAX rows "replay_done" says truncated and
+    the client should reload notification_list instead.
+    """
+
     async def connect(self):
         user = self.scope['user']
+        self.last_id = 0
+        self.expiry = None
         if user.is_authenticated:
             self.group_name = f"user_{user.id}"
         else:
             self.group_name = "anonymous"
 
         await self.channel_layer.group_add(self.group_name, self.channel_name)
-        await self.accept()
+        await self.accept(subprotocol=self.scope.get('auth_subprotocol'))
+
+        expires = self.scope.get('auth_expires')
+        if user.is_authenticated and expires:
+            self.expiry = asyncio.create_task(self.close_at(expires))
+
+        # Current badge count; later changes arrive as unread_count events
+        if user.is_authenticated:
+            await self.send_unread(await database_sync_to_async(notifications.unread_count)(user))
+            after = _cursor(parse_qs(self.scope.get('query_string', b'').decode()).get('after', [None])[0])
+            if after is not None:
+                await self.replay(after)
+
+    async def close_at(self, expires):
+        await asyncio.sleep(max(expires - time.time(), 0))
+        await self.send(text_data=json.dumps({"type": "token_expired"}))
+        await self.close(code=4001)
 
     async def disconnect(self, close_code):
+        if self.expiry:
+            self.expiry.cancel()
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            data = json.loads(text_data or '')
+        except ValueError:
+            return
+        if isinstance(data, dict) and data.get('type') == 'replay' and self.scope['user'].is_authenticated:
+            after = _cursor(data.get('after'))
+            if after is not None:
+                await self.replay(after)
+
+    async def replay(self, after):
+        batch_size = settings.NOTIFICATION_REPLAY_BATCH_SIZE
+        remaining = settings.NOTIFICATION_REPLAY_MAX
+        truncated = False
+        while True:
+            limit = min(batch_size, remaining)
+            # One row past the page tells whether anything is left
+            page = await _missed_page(self.scope['user'], after, limit + 1)
+            more = len(page) > limit
+            page = page[:limit]
+            if page:
+                after = page[-1]['id']
+                remaining -= len(page)
+                await self.send(text_data=json.dumps({
+                    "type": "replay",
+                    "notifications": page,
+                }))
+            if not more:
+                break
+            if remaining <= 0:
+                truncated = True
+                break
+        self.last_id = max(self.last_id, after)
+        await self.send(text_data=json.dumps({
+            "type": "replay_done",
+            "last_id": after,
+            "truncated": truncated,
+        }))
+
     async def send_notification(self, event):
+        notification_id = event.get("id")
+        if notification_id is not None and notification_id <= self.last_id:
+            return  # already sent by replay
         await self.send(text_data=json.dumps({
+            "id": notification_id,
             "message": event["message"]
         }))
+
+    async def unread_count(self, event):
+        await self.send_unread(event["unread"])
+
+    async def send_unread(self, unread):
+        await self.send(text_data=json.dumps({
+            "type": "unread_count",
+            "unread": unread,
+        }))
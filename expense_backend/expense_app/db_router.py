@@ -0,0 +1,81 @@
+# expense_app/db_router.py
+"""
+Read-replica routing for the reporting endpoints.
+
+Views decorated with @read_from_replica run their reads against
+settings.REPLICA_DATABASE_ALIAS. Everything else, and every write, stays on
+"default". A user who wrote something within the last
+REPLICA_STICKY_SECONDS keeps reading from the primary, so reports never
+miss their own just-saved orders because of replication lag.
+"""
+import contextvars
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError
+
+logger = logging.getLogger(__name__)
+
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+def current_read_alias():
+    """Replica alias the current view reads from, or None when on the primary."""
+    return _read_alias.get()
+
+
+def _sticky_key(user_id):
+    return f"replica-sticky:{user_id}"
+
+
+def mark_recent_write(user):
+    """Pin `user`'s reads to the primary for the stickiness window."""
+    if settings.REPLICA_DATABASE_ALIAS and user is not None and user.is_authenticated:
+        cache.set(_sticky_key(user.pk), 1, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def replica_alias_for(user):
+    """Alias the user's reports may read from, or None for the primary."""
+    alias = settings.REPLICA_DATABASE_ALIAS
+    if not alias:
+        return None
+    if user is not None and user.is_authenticated and cache.get(_sticky_key(user.pk)):
+        return None
+    return alias
+
+
+def read_from_replica(view):
+    """
+    Route the reads of a (read-only) view to the replica. Goes below @api_view
+    so request.user is already authenticated. Falls back to the primary when
+    the replica cannot be reached.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = replica_alias_for(request.user)
+        if alias is None:
+            return view(request, *args, **kwargs)
+
+        token = _read_alias.set(alias)
+        try:
+            return view(request, *args, **kwargs)
+        except OperationalError as exc:
+            logger.warning("Replica read failed, retrying on primary", extra={'alias': alias, 'error': str(exc)})
+        finally:
+            _read_alias.reset(token)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return current_read_alias()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
@@ -0,0 +1,198 @@
+# expense_app/expense_import.py
+"""
+Bulk import of historical expenses from CSV.
+
+Columns: user (email or username), date (YYYY-MM-DD), amount, and optionally
+expense_type, description, is_verified, is_refunded.
+
+Every valid row produces the same records as expense_list_create POST
+(Expense, Order, Transaction, TransactionOrder), but they are validated and
+bulk-inserted a batch at a time, and admins get one summary notification for
+the whole import instead of one per expense.
+"""
+import csv
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .fields import to_money
+from .ledger import sync_expenses
+from .models import Expense, Order, Transaction, TransactionOrder, User
+from .notifications import notify
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 200
+REQUIRED_COLUMNS = {'user', 'date', 'amount'}
+EXPENSE_TYPES = {choice for choice, _ in Expense.EXPENSE_TYPE_CHOICES}
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+FALSE_VALUES = {'', '0', 'false', 'no', 'n'}
+
+
+def _parse_bool(value, errors, column):
+    value = (value or '').strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value not in FALSE_VALUES:
+        errors[column] = f"Expected true/false, got {value!r}."
+    return False
+
+
+def _parse_row(row, users, errors):
+    """Validated Expense kwargs for one CSV row; problems are collected in `errors`."""
+    user_id = users.get((row.get('user') or '').strip().lower())
+    if user_id is None:
+        errors['user'] = f"Unknown user {row.get('user')!r}."
+
+    try:
+        day = date.fromisoformat((row.get('date') or '').strip())
+    except ValueError:
+        errors['date'] = "Expected a date in YYYY-MM-DD format."
+        day = None
+
+    try:
+        amount = to_money((row.get('amount') or '').strip())
+        if amount is None or amount <= 0:
+            errors['amount'] = "Amount must be positive."
+    except (InvalidOperation, ValueError):
+        errors['amount'] = "Amount must be a number."
+        amount = None
+
+    expense_type = (row.get('expense_type') or '').strip() or 'Product'
+    if expense_type not in EXPENSE_TYPES:
+        errors['expense_type'] = f"Must be one of {sorted(EXPENSE_TYPES)}."
+
+    return {
+        'user_id': user_id,
+        'date': day,
+        'amount': amount,
+        'expense_type': expense_type,
+        'description': (row.get('description') or '').strip() or None,
+        'is_verified': _parse_bool(row.get('is_verified'), errors, 'is_verified'),
+        'is_refunded': _parse_bool(row.get('is_refunded'), errors, 'is_refunded'),
+    }
+
+
+def _resolve_users(rows, users):
+    """Add the batch's unseen user keys (email or username, case-insensitive) to `users` in one query."""
+    keys = {(row.get('user') or '').strip().lower() for row in rows} - set(users) - {''}
+    if not keys:
+        return
+    matches = User.objects.annotate(
+        email_key=Lower('email'), username_key=Lower('username')
+    ).filter(
+        Q(email_key__in=keys) | Q(username_key__in=keys)
+    ).values_list('id', 'email', 'username')
+    for user_id, email, username in matches:
+        for key in (email.lower(), username.lower()):
+            if key in keys:
+                users[key] = user_id
+    # Remember misses too, so they are not looked up again
+    for key in keys:
+        users.setdefault(key, None)
+
+
+def _insert_batch(valid):
+    """Bulk-create the expenses of one batch plus their orders, transactions and links."""
+    expenses = Expense.objects.bulk_create([Expense(**fields) for fields in valid])
+
+    stamps = [timezone.make_aware(datetime.combine(expense.date, time(12))) for expense in expenses]
+    orders = Order.objects.bulk_create([
+        Order(created_user_id=expense.user_id, calculated_price=expense.amount, created_date=stamp)
+        for expense, stamp in zip(expenses, stamps)
+    ])
+    transactions = Transaction.objects.bulk_create([
+        Transaction(
+            user_id=expense.user_id,
+            total_price=expense.amount,
+            status=Transaction.StatusChoices.PENDING,
+            from_date=stamp,
+            to_date=stamp,
+        )
+        for expense, stamp in zip(expenses, stamps)
+    ])
+    TransactionOrder.objects.bulk_create([
+        TransactionOrder(transaction=txn, expense=expense, order_id=order)
+        for expense, order, txn in zip(expenses, orders, transactions)
+    ])
+    # The orders only mirror the expenses, so only the expenses move balances
+    sync_expenses([expense.id for expense in expenses])
+    return expenses
+
+
+def _notify_admins(imported_by, summary):
+    notify(
+        User.objects.filter(role__role_name__iexact='admin'),
+        'expenses_imported',
+        {
+            'actor': imported_by.username,
+            'count': summary['imported'],
+            'amount': f"{summary['total_amount']:.2f}",
+            'first': str(summary['first_date']),
+            'last': str(summary['last_date']),
+        },
+        actor=imported_by,
+    )
+
+
+def import_expenses(stream, imported_by, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Import expenses from a text stream of CSV. Invalid rows are skipped and
+    reported (line number and per-column messages); each batch of valid rows is
+    inserted in its own transaction. Returns the import report; on a dry run
+    nothing is written and `imported` counts the rows that would be.
+    """
+    reader = csv.DictReader(stream)
+    missing = REQUIRED_COLUMNS - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(sorted(missing))}")
+
+    summary = {
+        'rows': 0, 'imported': 0, 'invalid': 0, 'total_amount': Decimal('0.00'),
+        'first_date': None, 'last_date': None, 'dry_run': dry_run, 'errors': [],
+    }
+    users = {}
+
+    while True:
+        batch = []
+        for row in islice(reader, batch_size):
+            batch.append((reader.line_num, row))
+        if not batch:
+            break
+
+        _resolve_users([row for _, row in batch], users)
+        valid = []
+        for line, row in batch:
+            errors = {}
+            fields = _parse_row(row, users, errors)
+            if errors:
+                summary['invalid'] += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append({'line': line, 'errors': errors})
+            else:
+                valid.append(fields)
+
+        summary['rows'] += len(batch)
+        if valid and not dry_run:
+            with transaction.atomic():
+                _insert_batch(valid)
+        summary['imported'] += len(valid)
+        summary['total_amount'] += sum(fields['amount'] for fields in valid)
+        dates = [fields['date'] for fields in valid]
+        if dates:
+            summary['first_date'] = min(dates + [summary['first_date'] or dates[0]])
+            summary['last_date'] = max(dates + [summary['last_date'] or dates[0]])
+
+    if summary['imported'] and not dry_run:
+        with transaction.atomic():
+            _notify_admins(imported_by, summary)
+
+    logger.info("Expense import finished", extra={key: summary[key] for key in ('rows', 'imported', 'invalid')})
+    return summary
@@ -0,0 +1,115 @@
+# expense_app/fields.py
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from dateutil import parser
+from django import forms
+from django.conf import settings
+from django.core import exceptions
+from django.db import models
+from django.utils import timezone
+
+CENT = Decimal('0.01')
+
+
+def to_money(value):
+    """Decimal rounded to paise, from a Decimal/int/float/str amount in rupees."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, float):
+        value = repr(value)
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class MoneyField(models.BigIntegerField):
+    """
+    Amount in rupees stored as an integer number of paise.
+
+    Python code sees Decimal('12.34'); the column holds 1234, so SUM() and
+    comparisons are exact integer arithmetic in the database. Expressions
+    combining money columns need output_field=MoneyField() to be read back
+    as rupees.
+    """
+    description = "Money amount (stored as integer paise)"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return Decimal(int(value)).scaleb(-2)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Decimal):
+            return value
+        try:
+            return to_money(value)
+        except (InvalidOperation, TypeError, ValueError):
+            raise exceptions.ValidationError(
+                self.error_messages['invalid'], code='invalid', params={'value': value}
+            )
+
+    def get_prep_value(self, value):
+        if value is None or hasattr(value, 'resolve_expression'):
+            return value
+        return int(to_money(value) * 100)
+
+    def formfield(self, **kwargs):
+        return super(models.BigIntegerField, self).formfield(**{
+            'form_class': forms.DecimalField,
+            'decimal_places': 2,
+            'max_digits': 17,
+            **kwargs,
+        })
+
+
+@lru_cache(maxsize=None)
+def _zone(name):
+    return ZoneInfo(name)
+
+
+def business_timezone():
+    """Time zone the business days (reports, day filters, available dates) are counted in."""
+    return _zone(settings.BUSINESS_TIME_ZONE)
+
+
+def business_date(value=None):
+    """Business-day date of a datetime (aware, naive or ISO string); today when omitted."""
+    if isinstance(value, str):
+        value = parser.isoparse(value)
+    if value is not None and not isinstance(value, datetime):
+        return value  # already a date
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return timezone.localdate(value, timezone=business_timezone())
+
+
+class LocalDateField(models.DateField):
+    """
+    Stored business-day date of another DateTimeField on the model (`source`),
+    filled in on every save and bulk_create so day filters and groupings can be
+    plain indexed comparisons instead of a function over the timestamp.
+
+    Declare it after `source` so auto_now_add sources are already set. Updates
+    that bypass the model (QuerySet.update / bulk_update of `source`) must set
+    it themselves.
+    """
+
+    def __init__(self, *args, source=None, **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        if kwargs.get('editable') is False:
+            del kwargs['editable']
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.source)
+        if value is not None:
+            value = business_date(value)
+            setattr(model_instance, self.attname, value)
+        return value
@@ -0,0 +1,201 @@
+# expense_app/ledger.py
+"""
+Per-user money ledger.
+
+Every expense, order and settlement contributes a signed amount to its
+user's balance (positive: the user is owed money):
+
+    expense      +amount          while verified and not refunded
+    order        -calculated_price unless it only mirrors an expense
+    transaction  +total_price     for a completed settlement (the payment)
+
+sync_*() compares a source's current contribution with what the ledger has
+recorded for it, and appends an entry for the difference. Each entry moves
+the user's UserBalance row in the same database transaction, so a balance
+is a single-row lookup. Deleted sources fall back to 0, which reverses them.
+Entries are never updated or deleted; the reconcile_ledger command finds and
+corrects any drift.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Sum, Value, When
+from django.utils import timezone
+
+from .fields import MoneyField, to_money
+from .models import Expense, LedgerEntry, Order, Transaction, TransactionOrder, UserBalance
+
+BATCH_SIZE = 2000
+ZERO = Value(0, output_field=MoneyField())
+
+
+def _expense_contributions(ids):
+    return Expense.objects.filter(id__in=ids).annotate(
+        contribution=Case(
+            When(is_verified=True, is_refunded=False, then=F('amount')),
+            default=ZERO,
+        )
+    ).values_list('id', 'user_id', 'contribution')
+
+
+def _order_contributions(ids):
+    mirrors_expense = TransactionOrder.objects.filter(order_id=OuterRef('pk'), expense__isnull=False)
+    return Order.objects.filter(id__in=ids).annotate(
+        contribution=Case(
+            When(Exists(mirrors_expense), then=ZERO),
+            default=-F('calculated_price'),
+            output_field=MoneyField(),
+        )
+    ).values_list('id', 'created_user_id', 'contribution')
+
+
+def _transaction_contributions(ids):
+    return Transaction.objects.filter(id__in=ids, user__isnull=False).annotate(
+        contribution=Case(
+            When(is_settlement=True, status=Transaction.StatusChoices.COMPLETED, then=F('total_price')),
+            default=ZERO,
+        )
+    ).values_list('id', 'user_id', 'contribution')
+
+
+CONTRIBUTIONS = {
+    LedgerEntry.Kind.EXPENSE: _expense_contributions,
+    LedgerEntry.Kind.ORDER: _order_contributions,
+    LedgerEntry.Kind.TRANSACTION: _transaction_contributions,
+}
+
+
+def _lock_balances(user_ids, balances):
+    """select_for_update the UserBalance rows of `user_ids` (created if missing) into `balances`."""
+    user_ids = sorted(set(user_ids) - balances.keys())
+    if not user_ids:
+        return
+    UserBalance.objects.bulk_create(
+        [UserBalance(user_id=user_id) for user_id in user_ids], ignore_conflicts=True
+    )
+    balances.update(
+        (row.user_id, row)
+        for row in UserBalance.objects.select_for_update().filter(user_id__in=user_ids).order_by('user_id')
+    )
+
+
+def _deltas(kind, ids):
+    """[(user_id, source_id, delta)] between each source's contribution and what the ledger holds."""
+    # (source, user) -> amount the ledger currently holds
+    recorded = defaultdict(int)
+    for source_id, user_id, total in (
+        LedgerEntry.objects.filter(kind=kind, source_id__in=ids)
+        .values_list('source_id', 'user_id').annotate(total=Sum('amount')).order_by()
+    ):
+        recorded[source_id, user_id] = total
+
+    wanted = {(source_id, user_id): value for source_id, user_id, value in CONTRIBUTIONS[kind](ids)}
+
+    deltas = []
+    for key in recorded.keys() | wanted.keys():
+        delta = wanted.get(key, 0) - recorded.get(key, 0)
+        if delta:
+            deltas.append((key[1], key[0], delta))
+    return deltas
+
+
+def _sync(kind, ids, dry_run=False):
+    """Append correcting entries for the given sources; returns the number of entries (to be) written."""
+    ids = list({source_id for source_id in ids if source_id is not None})
+    if not ids:
+        return 0
+    if dry_run:
+        return len(_deltas(kind, ids))
+
+    with transaction.atomic():
+        # Lock the balances of every user these sources touch (in a fixed order, so concurrent
+        # writers cannot deadlock) before reading what the ledger holds; two syncs of the same
+        # source then run one after the other instead of both appending the same delta
+        balances = {}
+        _lock_balances(
+            [user_id for _, user_id, _ in CONTRIBUTIONS[kind](ids)]
+            + list(LedgerEntry.objects.filter(kind=kind, source_id__in=ids).values_list('user_id', flat=True).distinct()),
+            balances,
+        )
+        deltas = _deltas(kind, ids)
+        if not deltas:
+            return 0
+        # A source may have changed owner since the lock list was built
+        _lock_balances([user_id for user_id, _, _ in deltas], balances)
+
+        now = timezone.now()
+        entries = []
+        for user_id, source_id, delta in sorted(deltas):
+            balance = balances[user_id]
+            balance.balance += delta
+            balance.updated_date = now
+            entries.append(LedgerEntry(
+                user_id=user_id, kind=kind, source_id=source_id, amount=delta,
+                balance_after=balance.balance, created_date=now,
+            ))
+        LedgerEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+        UserBalance.objects.bulk_update(
+            [balances[user_id] for user_id in sorted({user_id for user_id, _, _ in deltas})],
+            ['balance', 'updated_date'], batch_size=BATCH_SIZE,
+        )
+    return len(entries)
+
+
+def sync_expenses(ids):
+    return _sync(LedgerEntry.Kind.EXPENSE, ids)
+
+
+def sync_orders(ids):
+    return _sync(LedgerEntry.Kind.ORDER, ids)
+
+
+def sync_transactions(ids):
+    return _sync(LedgerEntry.Kind.TRANSACTION, ids)
+
+
+def _source_ids(kind):
+    """Ids of every current row of `kind` plus those the ledger knows about (deleted ones included)."""
+    model = {
+        LedgerEntry.Kind.EXPENSE: Expense,
+        LedgerEntry.Kind.ORDER: Order,
+        LedgerEntry.Kind.TRANSACTION: Transaction,
+    }[kind]
+    current = set(model.objects.values_list('id', flat=True))
+    known = set(LedgerEntry.objects.filter(kind=kind).values_list('source_id', flat=True).distinct())
+    return sorted(current | known)
+
+
+def sync_all(batch_size=BATCH_SIZE, dry_run=False):
+    """Bring every source up to date (backfill or repair); returns entries written per kind."""
+    written = {}
+    for kind in CONTRIBUTIONS:
+        ids = _source_ids(kind)
+        written[kind] = sum(
+            _sync(kind, ids[i:i + batch_size], dry_run) for i in range(0, len(ids), batch_size)
+        )
+    return written
+
+
+def balance_drift():
+    """Users whose UserBalance differs from the sum of their entries: [(user_id, stored, expected)]."""
+    expected = dict(
+        LedgerEntry.objects.values_list('user_id').annotate(total=Sum('amount')).order_by()
+    )
+    stored = dict(UserBalance.objects.values_list('user_id', 'balance'))
+    return [
+        (user_id, stored.get(user_id, 0), expected.get(user_id, 0))
+        for user_id in sorted(expected.keys() | stored.keys())
+        if stored.get(user_id, 0) != expected.get(user_id, 0)
+    ]
+
+
+def fix_balance_drift(drift):
+    with transaction.atomic():
+        for user_id, _, expected in drift:
+            UserBalance.objects.update_or_create(user_id=user_id, defaults={'balance': expected})
+
+
+def user_balance(user):
+    """Current balance of `user` (one primary-key lookup)."""
+    balance = UserBalance.objects.filter(user=user).values_list('balance', flat=True).first()
+    return to_money(0) if balance is None else balance
@@ -0,0 +1,41 @@
+# expense_app/logging_utils.py
+import json
+import logging
+import random
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through only a fraction (`rate`) of records below `always_level`.
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rate=1.0, always_level='WARNING'):
+        super().__init__()
+        self.rate = float(rate)
+        self.always_level = logging.getLevelName(always_level)
+
+    def filter(self, record):
+        if record.levelno >= self.always_level or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message plus any `extra` fields."""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        payload.update({key: value for key, value in vars(record).items() if key not in _RESERVED})
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
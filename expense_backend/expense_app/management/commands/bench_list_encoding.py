@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from expense_app.renderers import MessagePackRenderer
+
+from expense_app.models import Expense, Order, OrderItem
+from expense_app.row_encoders import encode_expenses, encode_order_items, encode_orders
+from expense_app.serializers import ExpenseSerializer, OrderItemSerializer, OrderSerializer
+from expense_app.views import orders_with_items
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ModelSerializer and row-encoder rendering of the large list endpoints: "
+        "checks the JSON is byte-identical and reports rows/sec for both, plus the "
+        "size and speed of the same rows as MessagePack."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory().get('/api/expenses/', HTTP_HOST='localhost'))
+        renderer = JSONRenderer()
+        msgpack_request = Request(RequestFactory().get('/api/expenses/', HTTP_HOST='localhost'))
+        msgpack_request.accepted_renderer = MessagePackRenderer()
+        msgpack_renderer = MessagePackRenderer()
+
+        cases = [
+            (
+                'order_item_list',
+                lambda: OrderItemSerializer(OrderItem.objects.all(), many=True).data,
+                lambda: encode_order_items(OrderItem.objects.all()),
+                lambda: encode_order_items(OrderItem.objects.all(), native=True),
+                OrderItem.objects.count(),
+            ),
+            (
+                'expense_list_create',
+                lambda: ExpenseSerializer(
+                    Expense.objects.all().order_by('-date'), many=True, context={'request': request}
+                ).data,
+                lambda: encode_expenses(Expense.objects.all().order_by('-date'), request),
+                lambda: encode_expenses(Expense.objects.all().order_by('-date'), msgpack_request),
+                Expense.objects.count(),
+            ),
+            (
+                'order_list_create',
+                lambda: OrderSerializer(orders_with_items(), many=True).data,
+                lambda: encode_orders(Order.objects.all()),
+                lambda: encode_orders(Order.objects.all(), native=True),
+                Order.objects.count(),
+            ),
+        ]
+
+        for name, slow, fast, native, rows in cases:
+            slow_bytes, slow_time = self._time(lambda: renderer.render(slow()), options['repeat'])
+            fast_bytes, fast_time = self._time(lambda: renderer.render(fast()), options['repeat'])
+            if slow_bytes != fast_bytes:
+                raise CommandError(f"{name}: row encoder output differs from the serializer output")
+
+            self.stdout.write(
+                f"{name:22} rows={rows:8}  serializer={rows / slow_time:12,.0f} rows/s  "
+                f"encoder={rows / fast_time:12,.0f} rows/s  speedup={slow_time / fast_time:5.1f}x"
+            )
+
+            packed, packed_time = self._time(lambda: msgpack_renderer.render(native()), options['repeat'])
+            self.stdout.write(
+                f"{'':22} json={len(fast_bytes):10,} B  msgpack={len(packed):10,} B "
+                f"({len(packed) / max(len(fast_bytes), 1):4.0%})  msgpack={rows / packed_time:12,.0f} rows/s"
+            )
+
+    def _time(self, render, repeat):
+        best, output = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = render()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return output, max(best, 1e-9)
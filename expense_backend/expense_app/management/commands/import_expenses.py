@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expense_app.expense_import import BATCH_SIZE, import_expenses
+from expense_app.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Import historical expenses from a CSV file (columns: user, date, amount, "
+        "expense_type, description, is_verified, is_refunded) with bulk inserts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--as', dest='imported_by', required=True,
+                            help='Email of the admin the import (and its notifications) is attributed to.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing.')
+        parser.add_argument('--report', help='Write the full JSON report (including row errors) to this path.')
+
+    def handle(self, *args, **options):
+        imported_by = User.objects.filter(email=options['imported_by']).first()
+        if imported_by is None:
+            raise CommandError(f"No user with email {options['imported_by']!r}.")
+
+        try:
+            with open(options['csv_path'], newline='', encoding='utf-8-sig') as fh:
+                report = import_expenses(fh, imported_by, options['batch_size'], options['dry_run'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors'][:20]:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        if options['report']:
+            with open(options['report'], 'w') as fh:
+                json.dump(report, fh, indent=2, default=str)
+
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['imported']} of {report['rows']} rows "
+            f"(₹{report['total_amount']:.2f}); {report['invalid']} invalid."
+        ))
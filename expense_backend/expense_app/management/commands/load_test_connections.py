@@ -0,0 +1,97 @@
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from expense_app.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Hit an endpoint from several threads (like daphne's threadpool) and report "
+        "throughput and how many database connections were opened. Run it with "
+        "DB_POOL=false and DB_POOL=true (or SQLITE_PROFILE=default / wal) to compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=50, help='Requests per thread.')
+        parser.add_argument('--url', default='/api/orders/?page=1')
+        parser.add_argument('--user', help='Email of the user to authenticate as (default: first admin).')
+
+    def handle(self, *args, **options):
+        users = User.objects.select_related('role')
+        if options['user']:
+            user = users.filter(email=options['user']).first()
+        else:
+            user = users.filter(role__role_name__iexact='admin').order_by('id').first()
+        if user is None:
+            raise CommandError("No user to authenticate as; run `manage.py seed_data` first or pass --user.")
+        token = str(AccessToken.for_user(user))
+        # Start from a clean slate so the setup queries above don't count
+        connections.close_all()
+
+        lock = threading.Lock()
+        opened = []
+        latencies, errors = [], []
+
+        def on_connect(sender, connection, **kwargs):
+            with lock:
+                opened.append(connection.alias)
+
+        def worker():
+            client = Client(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Bearer {token}')
+            local = []
+            try:
+                for _ in range(options['requests']):
+                    start = time.perf_counter()
+                    response = client.get(options['url'])
+                    # The test client keeps connections open across requests; do what the
+                    # request_finished handler does in production (close / return to the pool)
+                    close_old_connections()
+                    local.append((time.perf_counter() - start) * 1000)
+                    if response.status_code >= 400:
+                        with lock:
+                            errors.append(response.status_code)
+            finally:
+                connections.close_all()
+                with lock:
+                    latencies.extend(local)
+
+        connection_created.connect(on_connect)
+        try:
+            threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            connection_created.disconnect(on_connect)
+
+        total = len(latencies)
+        ordered = sorted(latencies)
+        database = connections['default']
+        pool = getattr(database, 'pool', None)
+
+        self.stdout.write(f"database        {database.vendor} ({'pooled' if pool else 'no pool'}, "
+                          f"CONN_MAX_AGE={database.settings_dict.get('CONN_MAX_AGE')})")
+        self.stdout.write(f"requests        {total} from {options['threads']} threads, {len(errors)} errors")
+        self.stdout.write(f"throughput      {total / elapsed:,.1f} req/s")
+        if ordered:
+            self.stdout.write(f"latency         p50={statistics.median(ordered):.2f}ms  "
+                              f"p95={ordered[max(0, round(0.95 * total) - 1)]:.2f}ms")
+        self.stdout.write(f"connects        {len(opened)} Django connection setups "
+                          f"({len(opened) / max(total, 1):.2f} per request)")
+        if pool is not None:
+            # Physical connections: what the pool actually opened against the server
+            stats = pool.get_stats()
+            self.stdout.write(f"pool            opened={stats.get('connections_num', 0)}  "
+                              f"size={stats.get('pool_size')}  waiting={stats.get('requests_waiting', 0)}  "
+                              f"checkout_wait_ms={stats.get('requests_wait_ms', 0)}")
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from expense_app.notification_retention import apply_retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply the notification retention policy: purge rows older than "
+        "NOTIFICATION_RETENTION_DAYS, archive read rows older than "
+        "NOTIFICATION_ARCHIVE_READ_AFTER_DAYS and cap each recipient at "
+        "NOTIFICATION_MAX_PER_RECIPIENT live rows. Works in small batches; run it from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.NOTIFICATION_PURGE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be affected.')
+
+    def handle(self, *args, **options):
+        result = apply_retention(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = 'Would affect' if options['dry_run'] else 'Done'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb}: purged {result['purged']} live / {result['purged_archive']} archived "
+            f"notifications and {result['purged_events']} events, "
+            f"archived {result['archived_read']} read and {result['archived_over_cap']} over the cap"
+            + (f"; fixed {result['counters_fixed']} unread counters." if 'counters_fixed' in result else ".")
+        ))
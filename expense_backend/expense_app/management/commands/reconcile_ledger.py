@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from expense_app.ledger import balance_drift, fix_balance_drift, sync_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Check every stored balance against its ledger entries, and the entries against the "
+        "current expenses, orders and settlements. With --fix, repair the balances and append "
+        "correcting entries (this is also how the ledger is first filled for existing data)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Write the corrections (default: report only).')
+
+    def handle(self, *args, **options):
+        fix = options['fix']
+        drift = balance_drift()
+        for user_id, stored, expected in drift[:20]:
+            self.stderr.write(f"user {user_id}: balance {stored} but entries sum to {expected}")
+        if fix and drift:
+            fix_balance_drift(drift)
+
+        corrections = sync_all(dry_run=not fix)
+        summary = ", ".join(f"{count} {kind}" for kind, count in corrections.items())
+        if fix:
+            self.stdout.write(self.style.SUCCESS(
+                f"Repaired {len(drift)} balances; appended correcting entries: {summary}."
+            ))
+        elif drift or any(corrections.values()):
+            self.stdout.write(self.style.WARNING(
+                f"{len(drift)} balances differ from their entries; sources needing entries: {summary}. "
+                "Run with --fix to repair."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("Ledger and balances are consistent."))
@@ -0,0 +1,155 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from expense_app import urls as app_urls
+from expense_app.fields import business_date
+from expense_app.models import (
+    Category, Expense, Item, Notification, Order, OrderItem, OrderItemDay, Role, Transaction, User,
+)
+
+# Model providing the sample primary key for detail endpoints
+DETAIL_MODELS = {
+    'role-detail': Role,
+    'category-detail': Category,
+    'item-detail': Item,
+    'item-price-history': Item,
+    'expense-detail': Expense,
+    'order-detail': Order,
+    'order-item-detail': OrderItem,
+    'transaction-detail': Transaction,
+    'notification-detail': Notification,
+}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every GET endpoint in expense_app/urls.py through the test client "
+        "and write p50/p95 latency, query counts and peak memory to JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--output', default='bench_output.json')
+        parser.add_argument('--only', nargs='*', help='Restrict to these URL names.')
+        parser.add_argument('--user', help='Email of the (admin) user to authenticate as.')
+
+    def handle(self, *args, **options):
+        user = self._benchmark_user(options['user'])
+        client = Client(
+            HTTP_HOST='localhost',
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}',
+        )
+
+        results = []
+        for name, url, params in self._endpoints(user, options['only']):
+            results.append(self._measure(client, name, url, params, options['iterations'], options['warmup']))
+            row = results[-1]
+            self.stdout.write(
+                f"{name:32} {row['status']:>3}  p50={row['p50_ms']:8.2f}ms  p95={row['p95_ms']:8.2f}ms  "
+                f"queries={row['queries']:4}  peak={row['peak_kib']:9.1f}KiB"
+            )
+
+        report = {
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'dataset': {
+                model.__name__: model.objects.count()
+                for model in (User, Category, Item, Order, OrderItem, Expense, Notification, Transaction)
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {options['output']}"))
+
+    def _benchmark_user(self, email):
+        users = User.objects.select_related('role')
+        if email:
+            user = users.filter(email=email).first()
+        else:
+            user = users.filter(role__role_name__iexact='admin').order_by('id').first()
+        if not user:
+            raise CommandError("No admin user found; run `manage.py seed_data` first or pass --user.")
+        return user
+
+    def _endpoints(self, user, only):
+        sample_day = OrderItemDay.objects.filter(user=user).order_by('-date').first()
+        default_params = {
+            'orders-by-date': {
+                'date': sample_day.date.isoformat() if sample_day else business_date().isoformat(),
+                'username': user.username,
+            },
+        }
+
+        for pattern in app_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            if only and pattern.name not in only:
+                continue
+            view_class = getattr(pattern.callback, 'cls', None)
+            if view_class is None or 'get' not in view_class.http_method_names:
+                continue
+
+            kwargs = {}
+            if pattern.pattern.converters:
+                model = DETAIL_MODELS.get(pattern.name)
+                queryset = model.objects.all() if model else None
+                if model is Notification:
+                    queryset = queryset.filter(recipient=user)
+                sample = queryset.order_by('-pk').first() if queryset is not None else None
+                if sample is None:
+                    continue
+                kwargs = {key: sample.pk for key in pattern.pattern.converters}
+
+            yield pattern.name, reverse(pattern.name, kwargs=kwargs), default_params.get(pattern.name, {})
+
+    def _measure(self, client, name, url, params, iterations, warmup):
+        for _ in range(warmup):
+            client.get(url, params)
+
+        timings, query_counts = [], []
+        status = None
+        for _ in range(iterations):
+            with CaptureQueriesContext(connections['default']) as queries:
+                start = time.perf_counter()
+                response = client.get(url, params)
+                timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries))
+            status = response.status_code
+
+        # Separate pass: tracemalloc slows everything down, so it must not skew the timings
+        tracemalloc.start()
+        client.get(url, params)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'name': name,
+            'url': url,
+            'params': params,
+            'status': status,
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': max(query_counts),
+            'response_bytes': len(response.content),
+            'peak_kib': round(peak / 1024, 1),
+        }
@@ -0,0 +1,168 @@
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from expense_app.fields import business_date, business_timezone, to_money
+from expense_app.models import (
+    Category, Expense, Item, Notification, NotificationEvent, Order, OrderItem, Role, User,
+)
+from expense_app.ledger import sync_expenses, sync_orders
+from expense_app.notifications import reconcile_unread
+from expense_app.order_days import rebuild_all_days
+from expense_app.response_cache import bump_version
+
+CATEGORY_NAMES = ['Breakfast', 'Lunch', 'Snacks', 'Beverages', 'Stationery', 'Cleaning', 'Travel', 'Misc']
+EXPENSE_TYPES = [choice for choice, _ in Expense.EXPENSE_TYPE_CHOICES]
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic dataset (users, catalog, daily orders, expenses, notifications) with bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--admins', type=int, default=2)
+        parser.add_argument('--categories', type=int, default=6)
+        parser.add_argument('--items', type=int, default=40)
+        parser.add_argument('--days', type=int, default=60, help='Days of order history per user.')
+        parser.add_argument('--max-lines', type=int, default=4, help='Max order items per user per day.')
+        parser.add_argument('--expenses', type=int, default=10, help='Expenses per user.')
+        parser.add_argument('--prefix', default='synthetic')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch = options['batch_size']
+        prefix = options['prefix']
+
+        with transaction.atomic():
+            admin_role, _ = Role.objects.get_or_create(role_name='admin')
+            user_role, _ = Role.objects.get_or_create(role_name='user')
+
+            # Users (one password hash shared by all of them: hashing is the slow part)
+            start = User.objects.filter(username__startswith=f'{prefix}_').count()
+            password = make_password('synthetic-password')
+            users = User.objects.bulk_create(
+                [
+                    User(
+                        username=f'{prefix}_{n}',
+                        email=f'{prefix}_{n}@example.com',
+                        name=f'Synthetic User {n}',
+                        password=password,
+                        role=admin_role if i < options['admins'] else user_role,
+                    )
+                    for i, n in enumerate(range(start, start + options['users']))
+                ],
+                batch_size=batch,
+            )
+            admins = [user for user in users if user.role_id == admin_role.id]
+            creator = admins[0] if admins else users[0]
+
+            # Catalog
+            categories = Category.objects.bulk_create(
+                [
+                    Category(category_name=CATEGORY_NAMES[i % len(CATEGORY_NAMES)], created_user=creator)
+                    for i in range(options['categories'])
+                ],
+                batch_size=batch,
+            )
+            items = Item.objects.bulk_create(
+                [
+                    Item(
+                        category=rng.choice(categories),
+                        created_user=creator,
+                        item_name=f'{prefix} item {i}',
+                        item_price=to_money(rng.uniform(5, 150)),
+                    )
+                    for i in range(options['items'])
+                ],
+                batch_size=batch,
+            )
+
+            # One order per user per day, each with a few morning/evening lines
+            today = business_date()
+            orders, lines = [], []
+            for user in users:
+                for offset in range(options['days']):
+                    day = today - timedelta(days=offset)
+                    added = datetime.combine(day, time(9), tzinfo=business_timezone()) + timedelta(minutes=rng.randint(0, 600))
+                    order_lines = []
+                    for item in rng.sample(items, rng.randint(1, min(options['max_lines'], len(items)))):
+                        order_lines.append(OrderItem(
+                            item=item,
+                            morning_count=rng.randint(0, 3),
+                            evening_count=rng.randint(0, 3),
+                            added_date=added,
+                            price=item.item_price,
+                        ))
+                    total = sum(line.item.item_price * line.count for line in order_lines)
+                    orders.append(Order(created_user=user, calculated_price=total, created_date=added))
+                    lines.append(order_lines)
+
+            orders = Order.objects.bulk_create(orders, batch_size=batch)
+            order_items = []
+            for order, order_lines in zip(orders, lines):
+                for line in order_lines:
+                    line.order = order
+                    order_items.append(line)
+            OrderItem.objects.bulk_create(order_items, batch_size=batch)
+
+            # Expenses, each notifying every admin (same fan-out as expense_list_create)
+            expenses = Expense.objects.bulk_create(
+                [
+                    Expense(
+                        user=user,
+                        date=today - timedelta(days=rng.randint(0, max(options['days'] - 1, 0))),
+                        description=f'{prefix} expense',
+                        expense_type=rng.choice(EXPENSE_TYPES),
+                        amount=to_money(rng.uniform(20, 2000)),
+                        is_verified=rng.random() < 0.6,
+                        is_refunded=rng.random() < 0.3,
+                    )
+                    for user in users
+                    for _ in range(options['expenses'])
+                ],
+                batch_size=batch,
+            )
+            events = NotificationEvent.objects.bulk_create(
+                [
+                    NotificationEvent(
+                        template_key='expense_submitted',
+                        params={'actor': expense.user.username, 'amount': str(expense.amount), 'date': str(expense.date)},
+                        actor=expense.user,
+                        expense=expense,
+                    )
+                    for expense in expenses
+                ],
+                batch_size=batch,
+            )
+            Notification.objects.bulk_create(
+                [
+                    Notification(
+                        event=event,
+                        recipient=admin,
+                        is_read=rng.random() < 0.5,
+                        created_date=event.created_date,
+                    )
+                    for event in events
+                    for admin in admins
+                ],
+                batch_size=batch,
+            )
+
+            # bulk_create skips the signals that maintain the day index, ledger, unread counters and response cache
+            rebuild_all_days()
+            sync_orders([order.id for order in orders])
+            sync_expenses([expense.id for expense in expenses])
+            reconcile_unread([admin.id for admin in admins])
+            bump_version('categories')
+            bump_version('items')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(users)} users, {len(categories)} categories, {len(items)} items, "
+            f"{len(orders)} orders, {len(order_items)} order items, {len(expenses)} expenses, "
+            f"{len(expenses) * len(admins)} notifications."
+        ))
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expense_app.fields import business_date
+from expense_app.settlement import settle_period
+
+
+def _month(value):
+    try:
+        first = date(int(value[:4]), int(value[5:7]), 1)
+    except (ValueError, IndexError):
+        raise CommandError(f"Expected --month as YYYY-MM, got {value!r}.")
+    following = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    return first, following - timedelta(days=1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Settle every user's unsettled orders and verified expenses for a period into one "
+        "Transaction per user. Safe to rerun: already settled rows are skipped. "
+        "Defaults to the previous month."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='YYYY-MM (default: previous month).')
+        parser.add_argument('--start', type=date.fromisoformat, help='First day (YYYY-MM-DD), with --end.')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day (YYYY-MM-DD), inclusive.')
+        parser.add_argument('--user', type=int, action='append', dest='users', help='Only this user id (repeatable).')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be settled, write nothing.')
+
+    def handle(self, *args, **options):
+        if options['start'] or options['end']:
+            if not (options['start'] and options['end']):
+                raise CommandError("--start and --end go together.")
+            start, end = options['start'], options['end']
+        elif options['month']:
+            start, end = _month(options['month'])
+        else:
+            end = business_date().replace(day=1) - timedelta(days=1)
+            start = end.replace(day=1)
+
+        try:
+            summary = settle_period(start, end, users=options['users'], dry_run=options['dry_run'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        verb = 'Would settle' if options['dry_run'] else 'Settled'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {start} to {end}: {summary['users']} users, {summary['orders']} orders, "
+            f"{summary['expenses']} expenses, net ₹{summary['total']:.2f} "
+            f"({summary['settlements_created']} new settlements, "
+            f"{summary['skipped_completed']} completed skipped)."
+        ))
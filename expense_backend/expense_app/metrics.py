@@ -0,0 +1,84 @@
+# expense_app/metrics.py
+import threading
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class EndpointStats:
+    __slots__ = ('buckets', 'count', 'latency_sum', 'query_count', 'db_time', 'render_time')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last one is +Inf
+        self.count = 0
+        self.latency_sum = 0.0
+        self.query_count = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+
+
+class RequestMetrics:
+    """Per-process request histograms, keyed by (url name, method, status class)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def observe(self, endpoint, method, status, latency, query_count, db_time, render_time):
+        key = (endpoint, method, f"{status // 100}xx")
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats()
+            stats.buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+            stats.count += 1
+            stats.latency_sum += latency
+            stats.query_count += query_count
+            stats.db_time += db_time
+            stats.render_time += render_time
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            snapshot = sorted(
+                (key, list(stats.buckets), stats.count, stats.latency_sum,
+                 stats.query_count, stats.db_time, stats.render_time)
+                for key, stats in self._stats.items()
+            )
+
+        lines = [
+            '# HELP http_request_duration_seconds Request latency by URL name.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (endpoint, method, status), buckets, count, latency_sum, *_ in snapshot:
+            labels = f'endpoint="{endpoint}",method="{method}",status="{status}"'
+            cumulative = 0
+            for bound, hits in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+                cumulative += hits
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {latency_sum:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {count}')
+
+        counters = (
+            ('http_request_db_queries_total', 'Database queries run while serving requests.', 4),
+            ('http_request_db_seconds_total', 'Time spent in the database while serving requests.', 5),
+            ('http_request_render_seconds_total', 'Time spent rendering (serializing) responses.', 6),
+        )
+        for name, help_text, index in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for row in snapshot:
+                endpoint, method, status = row[0]
+                value = row[index]
+                value = f'{value:.6f}' if isinstance(value, float) else value
+                lines.append(f'{name}{{endpoint="{endpoint}",method="{method}",status="{status}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
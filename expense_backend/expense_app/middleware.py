@@ -0,0 +1,94 @@
+# expense_app/middleware.py
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .db_router import mark_recent_write
+from .metrics import request_metrics
+
+
+class QueryStats:
+    """connection.execute_wrapper() hook counting queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Records DB query count, DB time, render time and total latency per request.
+
+    The numbers go out as a `Server-Timing` header and are aggregated per URL
+    name into the in-process histogram served by the /metrics endpoint.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        stats = QueryStats()
+        request._render_timing = [0.0, 0.0]
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+
+        total = time.perf_counter() - start
+        render_started, render_finished = request._render_timing
+        render = max(render_finished - render_started, 0.0)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"',
+            f'render;dur={render * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = (match.view_name if match else None) or 'unmatched'
+        request_metrics.observe(
+            endpoint, request.method, response.status_code,
+            total, stats.count, stats.duration, render,
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before DRF renders the Response; the callback fires right after
+        timing = request._render_timing
+        timing[0] = time.perf_counter()
+
+        def render_done(rendered):
+            timing[1] = time.perf_counter()
+
+        response.add_post_render_callback(render_done)
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """
+    After a successful write request, pin the user's reads to the primary for a
+    few seconds (see db_router). DRF stores the JWT-authenticated user on the
+    underlying HttpRequest, so it is known here once the view has run.
+    """
+
+    UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method in self.UNSAFE_METHODS and response.status_code < 400:
+            mark_recent_write(getattr(request, 'user', None))
+        return response
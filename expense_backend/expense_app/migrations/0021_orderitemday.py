@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-19 13:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+
+
+def backfill_order_days(apps, schema_editor):
+    OrderItem = apps.get_model('expense_app', 'OrderItem')
+    OrderItemDay = apps.get_model('expense_app', 'OrderItemDay')
+    rows = (
+        OrderItem.objects
+        .annotate(owner_id=F('order__created_user_id'), day=TruncDate('added_date'))
+        .values('owner_id', 'day')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    OrderItemDay.objects.bulk_create(
+        [OrderItemDay(user_id=row['owner_id'], date=row['day'], item_count=row['n']) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense_app', '0020_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderItemDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='order_day_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='unique_order_day_per_user')],
+            },
+        ),
+        migrations.RunPython(backfill_order_days, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-19 13:47
+
+import django.db.models.expressions
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_prices(apps, schema_editor):
+    # Lines created before 0018 got price=0 and were billed at item.item_price;
+    # line_total is computed from price, so copy the item's price onto them
+    OrderItem = apps.get_model('expense_app', 'OrderItem')
+    Item = apps.get_model('expense_app', 'Item')
+    OrderItem.objects.filter(price=0).update(
+        price=Subquery(Item.objects.filter(pk=OuterRef('item_id')).values('item_price')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense_app', '0022_admin_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_prices, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='orderitem',
+            name='line_total',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('morning_count'), '+', models.F('evening_count')), '*', models.F('price')), output_field=models.DecimalField(decimal_places=2, max_digits=12)),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='total_count',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('morning_count'), '+', models.F('evening_count')), output_field=models.IntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['total_count'], name='order_item_total_count_idx'),
+        ),
+    ]
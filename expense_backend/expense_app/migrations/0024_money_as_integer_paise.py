@@ -0,0 +1,75 @@
+# Money columns (FloatField / DecimalField rupees) -> MoneyField (BigInteger paise)
+
+from django.db import migrations, models
+from django.db.models import BigIntegerField, F, FloatField, Value
+from django.db.models.functions import Cast, Round
+
+import expense_app.fields
+
+# (model, field, old field definition (null=True variant), final MoneyField)
+MONEY_FIELDS = [
+    ('item', 'item_price', models.FloatField(null=True), expense_app.fields.MoneyField()),
+    ('itempricehistory', 'price', models.FloatField(null=True), expense_app.fields.MoneyField()),
+    ('order', 'calculated_price', models.FloatField(null=True), expense_app.fields.MoneyField()),
+    ('orderitem', 'price', models.DecimalField(max_digits=10, decimal_places=2, null=True), expense_app.fields.MoneyField()),
+    ('expense', 'amount', models.FloatField(default=0, null=True), expense_app.fields.MoneyField(default=0)),
+    ('transaction', 'total_price', models.FloatField(null=True), expense_app.fields.MoneyField()),
+]
+
+
+def to_paise(apps, schema_editor):
+    for model_name, field, _, _ in MONEY_FIELDS:
+        model = apps.get_model('expense_app', model_name)
+        model.objects.update(**{
+            f'{field}_paise': Cast(Round(F(field) * 100), BigIntegerField()),
+        })
+
+
+def to_rupees(apps, schema_editor):
+    for model_name, field, _, _ in MONEY_FIELDS:
+        model = apps.get_model('expense_app', model_name)
+        model.objects.update(**{
+            field: Cast(F(f'{field}_paise'), FloatField()) / Value(100.0),
+        })
+
+
+def _operations():
+    add, relax, remove, rename, finalize = [], [], [], [], []
+    for model_name, field, old_nullable, final in MONEY_FIELDS:
+        add.append(migrations.AddField(
+            model_name=model_name, name=f'{field}_paise', field=expense_app.fields.MoneyField(null=True),
+        ))
+        # Nullable while converting, so every step can also be reversed
+        relax.append(migrations.AlterField(model_name=model_name, name=field, field=old_nullable))
+        remove.append(migrations.RemoveField(model_name=model_name, name=field))
+        rename.append(migrations.RenameField(model_name=model_name, old_name=f'{field}_paise', new_name=field))
+        finalize.append(migrations.AlterField(model_name=model_name, name=field, field=final))
+
+    return [
+        # line_total is generated from OrderItem.price, so it is rebuilt on top of the new column
+        migrations.RemoveField(model_name='orderitem', name='line_total'),
+        *add,
+        *relax,
+        migrations.RunPython(to_paise, to_rupees),
+        *remove,
+        *rename,
+        *finalize,
+        migrations.AddField(
+            model_name='orderitem',
+            name='line_total',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=(F('morning_count') + F('evening_count')) * F('price'),
+                output_field=expense_app.fields.MoneyField(),
+            ),
+        ),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense_app', '0023_orderitem_generated_totals'),
+    ]
+
+    operations = _operations()
@@ -0,0 +1,82 @@
+from django.db import migrations, models
+from django.db.models import Count, F
+
+import expense_app.fields
+from expense_app.fields import business_date
+
+BATCH_SIZE = 2000
+
+
+def _backfill(model, source):
+    rows = model.objects.only('id', source).order_by('id')
+    last_id = 0
+    while True:
+        batch = list(rows.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        for row in batch:
+            row.local_date = business_date(getattr(row, source))
+        model.objects.bulk_update(batch, ['local_date'])
+        last_id = batch[-1].id
+
+
+def backfill_local_dates(apps, schema_editor):
+    _backfill(apps.get_model('expense_app', 'OrderItem'), 'added_date')
+    _backfill(apps.get_model('expense_app', 'TransactionOrder'), 'created_date')
+
+
+def rebuild_order_days(apps, schema_editor):
+    # The available-dates index was bucketed in UTC; recount it by business day
+    OrderItem = apps.get_model('expense_app', 'OrderItem')
+    OrderItemDay = apps.get_model('expense_app', 'OrderItemDay')
+    rows = (
+        OrderItem.objects
+        .values(owner_id=F('order__created_user_id'), day=F('local_date'))
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    OrderItemDay.objects.all().delete()
+    OrderItemDay.objects.bulk_create(
+        [OrderItemDay(user_id=row['owner_id'], date=row['day'], item_count=row['n']) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense_app', '0024_money_as_integer_paise'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='local_date',
+            field=expense_app.fields.LocalDateField(null=True, source='added_date'),
+        ),
+        migrations.AddField(
+            model_name='transactionorder',
+            name='local_date',
+            field=expense_app.fields.LocalDateField(null=True, source='created_date'),
+        ),
+        migrations.RunPython(backfill_local_dates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='local_date',
+            field=expense_app.fields.LocalDateField(source='added_date'),
+        ),
+        migrations.AlterField(
+            model_name='transactionorder',
+            name='local_date',
+            field=expense_app.fields.LocalDateField(source='created_date'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['local_date'], name='order_item_local_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transactionorder',
+            index=models.Index(fields=['local_date'], name='txn_order_local_date_idx'),
+        ),
+        migrations.RunPython(rebuild_order_days, migrations.RunPython.noop),
+    ]
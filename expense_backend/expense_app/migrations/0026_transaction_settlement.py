@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-19 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense_app', '0025_local_date_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='is_settlement',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_settlement', True)), fields=('user', 'from_date', 'to_date'), name='unique_settlement_per_user_period'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-19 13:57
+
+import django.db.models.deletion
+import django.utils.timezone
+import expense_app.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense_app', '0026_transaction_settlement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserBalance',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='balance', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('balance', expense_app.fields.MoneyField(default=0)),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('expense', 'expense'), ('order', 'order'), ('transaction', 'transaction')], max_length=20)),
+                ('source_id', models.BigIntegerField()),
+                ('amount', expense_app.fields.MoneyField()),
+                ('balance_after', expense_app.fields.MoneyField()),
+                ('created_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'source_id'], name='ledger_source_idx'), models.Index(fields=['user', 'id'], name='ledger_user_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,143 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+TEMPLATES = {
+    'expense_submitted': "{actor} submitted an expense ₹{amount} on {date}",
+    'expense_verified': "Your expense of ₹{amount} on {date} has been verified",
+    'expenses_imported': "{actor} imported {count} expenses totalling ₹{amount} ({first} to {last})",
+    'message': "{message}",
+}
+
+
+def _attach_events(model, NotificationEvent, events):
+    """Point every row of `model` at an event; rows with the same sender/expense/text share one."""
+    rows = model.objects.order_by('id').values_list('id', 'user_id', 'expense_id', 'message', 'created_date')
+    pending = []
+    for row_id, user_id, expense_id, message, created_date in rows.iterator(chunk_size=BATCH_SIZE):
+        key = (user_id, expense_id, message)
+        if key not in events:
+            events[key] = NotificationEvent.objects.create(
+                template_key='message', params={'message': message},
+                actor_id=user_id, expense_id=expense_id, created_date=created_date,
+            ).id
+        pending.append(model(id=row_id, event_id=events[key]))
+        if len(pending) >= BATCH_SIZE:
+            model.objects.bulk_update(pending, ['event'])
+            pending = []
+    model.objects.bulk_update(pending, ['event'])
+
+
+def to_events(apps, schema_editor):
+    NotificationTemplate = apps.get_model('expense_app', 'NotificationTemplate')
+    NotificationEvent = apps.get_model('expense_app', 'NotificationEvent')
+    NotificationTemplate.objects.bulk_create(
+        [NotificationTemplate(key=key, text=text) for key, text in TEMPLATES.items()]
+    )
+    # Old rows only have their rendered text; keep it as the "message" template's param
+    events = {}
+    _attach_events(apps.get_model('expense_app', 'Notification'), NotificationEvent, events)
+    _attach_events(apps.get_model('expense_app', 'ArchivedNotification'), NotificationEvent, events)
+
+
+def to_messages(apps, schema_editor):
+    NotificationTemplate = apps.get_model('expense_app', 'NotificationTemplate')
+    texts = {**TEMPLATES, **dict(NotificationTemplate.objects.values_list('key', 'text'))}
+    for name in ('Notification', 'ArchivedNotification'):
+        model = apps.get_model('expense_app', name)
+        pending = []
+        for row in model.objects.select_related('event').iterator(chunk_size=BATCH_SIZE):
+            event = row.event
+            row.message = texts.get(event.template_key, '{message}').format_map(event.params)
+            row.user_id = event.actor_id or row.recipient_id  # the old column was required
+            row.expense_id = event.expense_id
+            pending.append(row)
+            if len(pending) >= BATCH_SIZE:
+                model.objects.bulk_update(pending, ['message', 'user', 'expense'])
+                pending = []
+        model.objects.bulk_update(pending, ['message', 'user', 'expense'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense_app', '0028_notification_retention'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('text', models.TextField(max_length=255)),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NotificationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template_key', models.CharField(max_length=50)),
+                ('params', models.JSONField(default=dict)),
+                ('created_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sent_notifications', to=settings.AUTH_USER_MODEL)),
+                ('expense', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='expense_app.expense')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_date'], name='notification_event_created_idx')],
+            },
+        ),
+        # The old columns become optional so the conversion can run both ways
+        migrations.AlterField(
+            model_name='notification',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='message',
+            field=models.TextField(default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='archivednotification',
+            name='message',
+            field=models.TextField(default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='expense_app.notificationevent'),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='expense_app.notificationevent'),
+        ),
+        migrations.RunPython(to_events, to_messages),
+        migrations.RemoveField(model_name='notification', name='user'),
+        migrations.RemoveField(model_name='notification', name='expense'),
+        migrations.RemoveField(model_name='notification', name='message'),
+        migrations.RemoveField(model_name='archivednotification', name='user'),
+        migrations.RemoveField(model_name='archivednotification', name='expense'),
+        migrations.RemoveField(model_name='archivednotification', name='message'),
+        migrations.AlterField(
+            model_name='notification',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='expense_app.notificationevent'),
+        ),
+        migrations.AlterField(
+            model_name='archivednotification',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='expense_app.notificationevent'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='created_date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
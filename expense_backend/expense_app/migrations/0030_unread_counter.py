@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-19 14:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_unread(apps, schema_editor):
+    Notification = apps.get_model('expense_app', 'Notification')
+    UnreadCounter = apps.get_model('expense_app', 'UnreadCounter')
+    rows = Notification.objects.filter(is_read=False).values('recipient_id').annotate(n=Count('id')).order_by()
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=row['recipient_id'], unread=row['n']) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense_app', '0029_templated_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.IntegerField(default=0)),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
@@ -5,8 +5,12 @@ from django.dispatch import receiver
 from django.db.models.signals import post_save, pre_save,post_delete
 from django.db.models import Sum,F
 import os
+import logging
+from .fields import LocalDateField, MoneyField
 from django.contrib.auth.models import BaseUserManager
 
+logger = logging.getLogger(__name__)
+
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -74,7 +78,7 @@ class Item(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     created_user = models.ForeignKey(User, on_delete=models.CASCADE)
     item_name = models.CharField(max_length=100)
-    item_price = models.FloatField()
+    item_price = MoneyField()
     created_date = models.DateTimeField(default=timezone.now)
     updated_date = models.DateTimeField(auto_now=True)
 
@@ -83,7 +87,7 @@ class Item(models.Model):
 
 class ItemPriceHistory(models.Model):
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
-    price = models.FloatField()
+    price = MoneyField()
     date = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
@@ -93,13 +97,18 @@ class ItemPriceHistory(models.Model):
 
 class Order(models.Model):
     created_user = models.ForeignKey(User, on_delete=models.CASCADE)
-    calculated_price = models.FloatField()
+    calculated_price = MoneyField()
     created_date = models.DateTimeField(default=timezone.now)
     updated_date = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_date'], name='order_created_idx'),
+        ]
+
     def update_total_price(self):
-        total_price = sum(order_item.item.item_price * order_item.count for order_item in self.orderitem_set.all())
-        print("total Price ", total_price)
+        total_price = self.orderitem_set.aggregate(total=Sum('line_total'))['total'] or 0
+        logger.debug("Order total recalculated", extra={'order_id': self.id, 'total_price': total_price})
         self.calculated_price = total_price
         self.save()
 
@@ -112,12 +121,38 @@ class OrderItem(models.Model):
     morning_count = models.IntegerField(default=0)
     evening_count = models.IntegerField(default=0)
     added_date = models.DateTimeField(default=timezone.now)
-    price = models.DecimalField(max_digits=10, decimal_places=2)  # ✅ Add this
+    local_date = LocalDateField(source='added_date')  # added_date's day in BUSINESS_TIME_ZONE
+    price = MoneyField()  # price of the item when it was ordered
+    # Computed and stored by the database, so totals can be summed in SQL.
+    # Not refreshed on in-memory edits: use `count` before save / refresh_from_db() after.
+    total_count = models.GeneratedField(
+        expression=F('morning_count') + F('evening_count'),
+        output_field=models.IntegerField(),
+        db_persist=True,
+    )
+    line_total = models.GeneratedField(
+        expression=(F('morning_count') + F('evening_count')) * F('price'),
+        output_field=MoneyField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['added_date'], name='order_item_added_idx'),
+            models.Index(fields=['local_date'], name='order_item_local_date_idx'),
+            models.Index(fields=['total_count'], name='order_item_total_count_idx'),
+        ]
 
     @property
     def count(self):
         return self.morning_count + self.evening_count
 
+    def set_count(self, count):
+        """Split a plain item count into morning/evening the way the API always has."""
+        count = int(count)
+        self.morning_count = count // 2
+        self.evening_count = count - self.morning_count
+
     def __str__(self):
         return f"{self.count}x {self.item.item_name} in Order #{self.order.id}"
 
@@ -129,6 +164,25 @@ def update_order_total(sender, instance, **kwargs):
     """Update order total price when an order item is modified."""
     instance.order.update_total_price()
 
+
+#Order days (distinct dates that have order items, kept in sync by signals)
+
+class OrderItemDay(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='order_days')
+    date = models.DateField()
+    item_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_order_day_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='order_day_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - user {self.user_id} ({self.item_count} items)"
+
 #Expense
 
 class Expense(models.Model):
@@ -143,12 +197,17 @@ class Expense(models.Model):
     description = models.TextField(blank=True, null=True)
     expense_type = models.CharField(max_length=100, choices=EXPENSE_TYPE_CHOICES, default='Product')  # Example default
     bill = models.FileField(upload_to=get_upload_path, blank=True, null=True)
-    amount = models.FloatField(default=0)
+    amount = MoneyField(default=0)
     is_verified = models.BooleanField(default=False)
     is_refunded = models.BooleanField(default=False)
     created_date = models.DateTimeField(default=timezone.now)
     updated_date = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['date'], name='expense_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.id} - {self.user.username} - {self.description}"
     
@@ -168,13 +227,23 @@ class Transaction(models.Model):
         COMPLETED = 'Completed', 'completed'
 
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True,related_name='transactions')
-    total_price = models.FloatField()
+    total_price = MoneyField()
     status = models.CharField(max_length=20, choices=StatusChoices.choices, default=StatusChoices.PENDING)
     from_date = models.DateTimeField()
     to_date = models.DateTimeField()
     remarks = models.TextField(max_length=255,null=True,blank=True)
+    is_settlement = models.BooleanField(default=False)  # created by settle_period for [from_date, to_date)
     created_date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'from_date', 'to_date'],
+                condition=models.Q(is_settlement=True),
+                name='unique_settlement_per_user_period',
+            ),
+        ]
+
     def __str__(self):
         return f"Transaction #{self.id} - {self.status}"
 
@@ -183,22 +252,137 @@ class TransactionOrder(models.Model):
     expense = models.ForeignKey(Expense,on_delete=models.CASCADE,null=True,blank=True)
     order_id = models.ForeignKey(Order,on_delete=models.CASCADE,null=True,blank=True) 
     created_date = models.DateTimeField(auto_now_add=True)
+    local_date = LocalDateField(source='created_date')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['local_date'], name='txn_order_local_date_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.transaction} - {self.expense or self.order}"
+        return f"{self.transaction} - {self.expense or self.order_id}"
 
 #Notifications
 
+class NotificationTemplate(models.Model):
+    """Message text for a template_key, a str.format() string over the event params."""
+    key = models.CharField(max_length=50, unique=True)
+    text = models.TextField(max_length=255)
+    updated_date = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.key
+
+
+class NotificationEvent(models.Model):
+    """One logical notification; delivered to each recipient through a Notification row."""
+    template_key = models.CharField(max_length=50)  # NotificationTemplate.key
+    params = models.JSONField(default=dict)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='sent_notifications')
+    expense = models.ForeignKey(Expense, on_delete=models.CASCADE, null=True, blank=True)
+    created_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_date'], name='notification_event_created_idx'),
+        ]
+
+    @property
+    def message(self):
+        from .notifications import render
+        return render(self.template_key, self.params)
+
+    def __str__(self):
+        return f"{self.template_key} {self.params}"
+
+
 class Notification(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_notifications')
+    event = models.ForeignKey(NotificationEvent, on_delete=models.CASCADE, related_name='deliveries')
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_notifications')
-    expense = models.ForeignKey(Expense, on_delete=models.CASCADE, null=True, blank=True)
-    message = models.TextField(max_length=255)
     is_read = models.BooleanField(default=False)
-    created_date = models.DateTimeField(auto_now_add=True)
+    created_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_date'], name='notification_created_idx'),
+            # notification_list and the per-recipient cap
+            models.Index(fields=['recipient', '-created_date'], name='notification_recipient_idx'),
+        ]
+
+    @property
+    def message(self):
+        return self.event.message
+
+    def __str__(self):
+        return f"Notification to {self.recipient_id}: {self.event.template_key}"
+
+
+class UnreadCounter(models.Model):
+    """Denormalized count of the user's unread live notifications (see notifications.py)."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    unread = models.IntegerField(default=0)
+    updated_date = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+
+class ArchivedNotification(models.Model):
+    """Read / over-cap notifications moved out of the live table by notification_retention."""
+    original_id = models.BigIntegerField()
+    event = models.ForeignKey(NotificationEvent, on_delete=models.CASCADE, related_name='+')
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    is_read = models.BooleanField(default=True)
+    created_date = models.DateTimeField()
+    archived_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_date'], name='archived_notif_created_idx'),
+            models.Index(fields=['recipient', '-created_date'], name='archived_notif_recipient_idx'),
+        ]
+
+    @property
+    def message(self):
+        return self.event.message
+
+    def __str__(self):
+        return f"Archived notification to {self.recipient_id}: {self.event.template_key}"
+
+#Ledger (append-only; see ledger.py)
+
+class LedgerEntry(models.Model):
+    class Kind(models.TextChoices):
+        EXPENSE = 'expense', 'expense'
+        ORDER = 'order', 'order'
+        TRANSACTION = 'transaction', 'transaction'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ledger_entries')
+    # Plain ids, not foreign keys: entries outlive the rows they describe
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    source_id = models.BigIntegerField()
+    amount = MoneyField()  # signed change; positive means the user is owed more
+    balance_after = MoneyField()
+    created_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'source_id'], name='ledger_source_idx'),
+            models.Index(fields=['user', 'id'], name='ledger_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.source_id}: {self.amount} (balance {self.balance_after})"
+
+
+class UserBalance(models.Model):
+    """Running total of the user's ledger entries."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='balance')
+    balance = MoneyField(default=0)
+    updated_date = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"Notification to {self.recipient.username}: {self.message[:20]}..."
+        return f"{self.user_id}: {self.balance}"
     
 
 
@@ -0,0 +1,146 @@
+# expense_app/notification_retention.py
+"""
+Notification retention, run periodically by `manage.py prune_notifications`.
+
+    1. purge     live and archived rows older than NOTIFICATION_RETENTION_DAYS are
+                 deleted, then the events nothing refers to any more
+    2. archive   read notifications older than NOTIFICATION_ARCHIVE_READ_AFTER_DAYS
+                 move to ArchivedNotification
+    3. cap       each recipient keeps the newest NOTIFICATION_MAX_PER_RECIPIENT live
+                 rows; older ones are archived (read or not)
+
+The live table therefore stays bounded per recipient, and notification_list
+costs the same however long the deployment has been running. Every step works
+in batches of NOTIFICATION_PURGE_BATCH_SIZE ids, each in its own short
+transaction, so no statement holds locks on a large part of the table.
+Unread counters are reconciled afterwards, since these raw deletes skip them.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from .models import ArchivedNotification, Notification, NotificationEvent
+from .notifications import reconcile_unread
+from .purge import raw_delete
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = ('id', 'event_id', 'recipient_id', 'is_read', 'created_date')
+
+
+def _batch_size(batch_size):
+    return batch_size or settings.NOTIFICATION_PURGE_BATCH_SIZE
+
+
+def delete_in_batches(queryset, batch_size=None):
+    """Delete the rows of `queryset` a batch of ids at a time; returns the number deleted."""
+    batch_size = _batch_size(batch_size)
+    model = queryset.model
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            with connection.cursor() as cursor:
+                deleted += raw_delete(cursor, model, model._meta.pk.column, ids)
+
+
+def _archive_ids(ids):
+    now = timezone.now()
+    rows = Notification.objects.filter(id__in=ids).values_list(*ARCHIVED_FIELDS)
+    ArchivedNotification.objects.bulk_create([
+        ArchivedNotification(
+            original_id=original_id, event_id=event_id, recipient_id=recipient_id,
+            is_read=is_read, created_date=created_date, archived_date=now,
+        )
+        for original_id, event_id, recipient_id, is_read, created_date in rows
+    ])
+    with connection.cursor() as cursor:
+        return raw_delete(cursor, Notification, Notification._meta.pk.column, ids)
+
+
+def archive_in_batches(queryset, batch_size=None):
+    """Move the notifications of `queryset` to the archive in batches; returns the number moved."""
+    batch_size = _batch_size(batch_size)
+    moved = 0
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return moved
+            moved += _archive_ids(ids)
+
+
+def archive_read(before, batch_size=None):
+    return archive_in_batches(Notification.objects.filter(is_read=True, created_date__lt=before), batch_size)
+
+
+def enforce_cap(cap, batch_size=None):
+    """Archive everything but the newest `cap` notifications of each recipient."""
+    batch_size = _batch_size(batch_size)
+    over = (
+        Notification.objects.values('recipient_id').annotate(n=Count('id'))
+        .filter(n__gt=cap).values_list('recipient_id', flat=True).order_by()
+    )
+    moved = 0
+    for recipient_id in list(over):
+        live = Notification.objects.filter(recipient_id=recipient_id).order_by('-created_date', '-id')
+        while True:
+            with transaction.atomic():
+                ids = list(live.values_list('id', flat=True)[cap:cap + batch_size])
+                if not ids:
+                    break
+                moved += _archive_ids(ids)
+    return moved
+
+
+def orphaned_events(before):
+    """
+    Events older than `before` that no live or archived notification from
+    `before` on refers to (rows older than that are purged first, so the dry
+    run counts the same events the real run deletes).
+    """
+    return NotificationEvent.objects.filter(created_date__lt=before).filter(
+        ~Exists(Notification.objects.filter(event=OuterRef('pk'), created_date__gte=before)),
+        ~Exists(ArchivedNotification.objects.filter(event=OuterRef('pk'), created_date__gte=before)),
+    )
+
+
+def apply_retention(now=None, batch_size=None, dry_run=False):
+    """Run the three steps with the configured limits; returns how many rows each step affected."""
+    now = now or timezone.now()
+    archive_before = now - timedelta(days=settings.NOTIFICATION_ARCHIVE_READ_AFTER_DAYS)
+    purge_before = now - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    cap = settings.NOTIFICATION_MAX_PER_RECIPIENT
+
+    if dry_run:
+        over_cap = sum(
+            row['n'] - cap
+            for row in Notification.objects.values('recipient_id').annotate(n=Count('id')).filter(n__gt=cap).order_by()
+        )
+        # Counted independently, so a row may show up under more than one step
+        return {
+            'purged': Notification.objects.filter(created_date__lt=purge_before).count(),
+            'purged_archive': ArchivedNotification.objects.filter(created_date__lt=purge_before).count(),
+            'purged_events': orphaned_events(purge_before).count(),
+            'archived_read': Notification.objects.filter(is_read=True, created_date__lt=archive_before).count(),
+            'archived_over_cap': over_cap,
+        }
+
+    result = {
+        'purged': delete_in_batches(Notification.objects.filter(created_date__lt=purge_before), batch_size),
+        'purged_archive': delete_in_batches(
+            ArchivedNotification.objects.filter(created_date__lt=purge_before), batch_size
+        ),
+        'purged_events': delete_in_batches(orphaned_events(purge_before), batch_size),
+        'archived_read': archive_read(archive_before, batch_size),
+        'archived_over_cap': enforce_cap(cap, batch_size),
+        'counters_fixed': reconcile_unread(),
+    }
+    logger.info("Notification retention applied", extra=result)
+    return result
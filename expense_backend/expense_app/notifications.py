@@ -0,0 +1,188 @@
+# expense_app/notifications.py
+"""
+Templated notifications.
+
+A notification is one NotificationEvent (template_key + small params dict,
+e.g. {"actor": "asha", "amount": "120.00", "date": "2026-10-19"}) fanned out
+to its recipients through Notification rows, so the text is neither stored
+nor copied per recipient. It is rendered when read, from the
+NotificationTemplate table, which every process caches in memory until a
+template is saved (the response-cache version of TEMPLATE_NAMESPACE, checked
+at most every VERSION_CHECK_SECONDS).
+
+Each user's unread count is kept in UnreadCounter, moved in the same
+transaction as the read-state change, and pushed to the user's sockets after
+commit, so clients don't need to poll notification_list for the badge.
+Bulk paths that bypass it (retention, seed data) call reconcile_unread().
+
+Live pushes carry the notification id. A reconnecting socket sends the last
+id it saw and gets what it missed from missed_since(), so it doesn't have to
+reload notification_list.
+"""
+import logging
+import time
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Notification, NotificationEvent, NotificationTemplate, UnreadCounter
+from .response_cache import get_version
+from .utils import send_realtime_notification, send_unread_count
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAMESPACE = 'notification-templates'
+
+# Used until the table has a row for the key (and by the data migration)
+DEFAULT_TEMPLATES = {
+    'expense_submitted': "{actor} submitted an expense ₹{amount} on {date}",
+    'expense_verified': "Your expense of ₹{amount} on {date} has been verified",
+    'expenses_imported': "{actor} imported {count} expenses totalling ₹{amount} ({first} to {last})",
+    'message': "{message}",
+}
+
+# Other workers' template edits show up within this many seconds (this process's at once)
+VERSION_CHECK_SECONDS = 5
+
+_cache = {'version': None, 'checked': float('-inf'), 'templates': {}}
+
+
+class _Params(dict):
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+
+def templates():
+    """key -> text, reloaded only when a template changed."""
+    now = time.monotonic()
+    if now - _cache['checked'] >= VERSION_CHECK_SECONDS:
+        # One cache round-trip per few seconds, not one per rendered notification
+        version = get_version(TEMPLATE_NAMESPACE)
+        if _cache['version'] != version:
+            _cache['templates'] = {
+                **DEFAULT_TEMPLATES,
+                **dict(NotificationTemplate.objects.values_list('key', 'text')),
+            }
+            _cache['version'] = version
+        _cache['checked'] = now
+    return _cache['templates']
+
+
+def forget_templates():
+    """Drop this process's templates (a template was saved here)."""
+    _cache['checked'] = float('-inf')
+
+
+def render(template_key, params):
+    text = templates().get(template_key, '{message}')
+    try:
+        return text.format_map(_Params(params or {}))
+    except (ValueError, IndexError):
+        logger.warning("Bad notification template", extra={'template_key': template_key})
+        return text
+
+
+def push(deliveries, event):
+    """Send the rendered event to each recipient's socket; a failed push only gets logged."""
+    message = event.message
+    for delivery in deliveries:
+        try:
+            send_realtime_notification(delivery.recipient, message, delivery.id)
+        except Exception as exc:
+            logger.warning("Realtime push failed", extra={'recipient_id': delivery.recipient_id, 'error': str(exc)})
+
+
+def push_unread(user_ids):
+    """Send the current unread count to each user's sockets (call after commit)."""
+    for user_id, unread in UnreadCounter.objects.filter(user_id__in=list(user_ids)).values_list('user_id', 'unread'):
+        try:
+            send_unread_count(user_id, unread)
+        except Exception as exc:
+            logger.warning("Unread count push failed", extra={'recipient_id': user_id, 'error': str(exc)})
+
+
+def change_unread(user_ids, delta):
+    """Move the unread counter of `user_ids` by `delta` and push the new values after commit."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids or not delta:
+        return
+    UnreadCounter.objects.bulk_create([UnreadCounter(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+    UnreadCounter.objects.filter(user_id__in=user_ids).update(
+        unread=F('unread') + delta, updated_date=timezone.now()
+    )
+    transaction.on_commit(lambda: push_unread(user_ids))
+
+
+def unread_count(user):
+    """The user's unread count: one primary-key lookup (counted once if the row is missing)."""
+    unread = UnreadCounter.objects.filter(user=user).values_list('unread', flat=True).first()
+    if unread is None:
+        unread = Notification.objects.filter(recipient=user, is_read=False).count()
+        UnreadCounter.objects.get_or_create(user=user, defaults={'unread': unread})
+    return unread
+
+
+def mark_read(user, notification_id=None):
+    """Mark one (or every) notification of `user` as read; returns how many changed."""
+    with transaction.atomic():
+        rows = Notification.objects.filter(recipient=user, is_read=False)
+        if notification_id is not None:
+            rows = rows.filter(pk=notification_id)
+        changed = rows.update(is_read=True)
+        change_unread([user.id], -changed)
+    return changed
+
+
+def reconcile_unread(user_ids=None):
+    """Recount unread notifications (all users, or `user_ids`); returns the number of counters fixed."""
+    counters = UnreadCounter.objects.all()
+    unread = Notification.objects.filter(is_read=False)
+    if user_ids is not None:
+        counters = counters.filter(user_id__in=user_ids)
+        unread = unread.filter(recipient_id__in=user_ids)
+    # Counted inside the UPDATE itself, so a notify()/mark_read() committing meanwhile isn't overwritten
+    actual = Coalesce(Subquery(
+        Notification.objects.filter(recipient_id=OuterRef('user_id'), is_read=False)
+        .order_by().values('recipient_id').annotate(n=Count('id')).values('n')
+    ), 0)
+
+    with transaction.atomic():
+        missing = unread.filter(~Exists(UnreadCounter.objects.filter(user_id=OuterRef('recipient_id'))))
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=user_id) for user_id in missing.values_list('recipient_id', flat=True).distinct()],
+            ignore_conflicts=True,
+        )
+        stale = list(counters.annotate(actual=actual).exclude(unread=F('actual')).values_list('user_id', flat=True))
+        if stale:
+            UnreadCounter.objects.filter(user_id__in=stale).update(unread=actual, updated_date=timezone.now())
+            transaction.on_commit(lambda: push_unread(stale))
+    return len(stale)
+
+
+def missed_since(user, after, limit):
+    """The user's next `limit` live notifications with an id above `after`, oldest first."""
+    return list(
+        Notification.objects.filter(recipient=user, id__gt=after)
+        .select_related('event').order_by('id')[:limit]
+    )
+
+
+def notify(recipients, template_key, params, actor=None, expense=None):
+    """
+    Store one event for `recipients` (one Notification row each) and push it
+    once the surrounding transaction commits. Returns the event.
+    """
+    recipients = list(recipients)
+    now = timezone.now()
+    event = NotificationEvent.objects.create(
+        template_key=template_key, params=params, actor=actor, expense=expense, created_date=now,
+    )
+    deliveries = Notification.objects.bulk_create([
+        Notification(event=event, recipient=recipient, is_read=False, created_date=now)
+        for recipient in recipients
+    ])
+    change_unread([recipient.id for recipient in recipients], 1)
+    transaction.on_commit(lambda: push(deliveries, event))
+    return event
@@ -0,0 +1,83 @@
+# expense_app/order_days.py
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .fields import business_date
+from .models import OrderItem, OrderItemDay
+from .response_cache import bump_version
+
+CACHE_NAMESPACE = 'available-dates'
+
+
+def order_day(value):
+    """Business day (BUSINESS_TIME_ZONE) an OrderItem.added_date falls on, i.e. its local_date."""
+    return business_date(value)
+
+
+def add_to_day(user_id, day, delta):
+    """Move the item counter of (user, day) by `delta`, creating/removing the row as needed."""
+    rows = OrderItemDay.objects.filter(user_id=user_id, date=day)
+    if delta > 0:
+        if rows.update(item_count=F('item_count') + delta):
+            return
+        try:
+            with transaction.atomic():
+                OrderItemDay.objects.create(user_id=user_id, date=day, item_count=delta)
+        except IntegrityError:
+            # Created concurrently, fall back to the increment
+            rows.update(item_count=F('item_count') + delta)
+            return
+        bump_version(CACHE_NAMESPACE)
+    elif delta < 0:
+        rows.update(item_count=F('item_count') + delta)
+        deleted, _ = rows.filter(item_count__lte=0).delete()
+        if deleted:
+            bump_version(CACHE_NAMESPACE)
+
+
+def rebuild_days(pairs):
+    """
+    Recount the given (user_id, day) pairs from OrderItem.
+    Used after set-based writes that bypass the per-row signals.
+    """
+    changed = False
+    for user_id, day in set(pairs):
+        count = OrderItem.objects.filter(order__created_user_id=user_id, local_date=day).count()
+        rows = OrderItemDay.objects.filter(user_id=user_id, date=day)
+        if count:
+            _, created = OrderItemDay.objects.update_or_create(
+                user_id=user_id, date=day, defaults={'item_count': count}
+            )
+            changed = changed or created
+        elif rows.delete()[0]:
+            changed = True
+    if changed:
+        bump_version(CACHE_NAMESPACE)
+
+
+
+def days_for_orders(order_ids):
+    """(user_id, day) pairs touched by the order items of the given orders."""
+    return set(
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .values_list('order__created_user_id', 'local_date')
+        .distinct()
+    )
+
+
+def rebuild_all_days():
+    """Rebuild the whole index in one grouped query (after bulk loads that skip signals)."""
+    rows = (
+        OrderItem.objects
+        .annotate(owner_id=F('order__created_user_id'), day=F('local_date'))
+        .values('owner_id', 'day')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic():
+        OrderItemDay.objects.all().delete()
+        OrderItemDay.objects.bulk_create(
+            [OrderItemDay(user_id=row['owner_id'], date=row['day'], item_count=row['n']) for row in rows],
+            batch_size=1000,
+        )
+    bump_version(CACHE_NAMESPACE)
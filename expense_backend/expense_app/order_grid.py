@@ -0,0 +1,116 @@
+# expense_app/order_grid.py
+from datetime import datetime, time
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .fields import MoneyField, business_date, business_timezone
+from .ledger import sync_orders
+from .models import Item, Order, OrderItem
+from .order_days import rebuild_days
+from .purge import raw_delete
+from .reports import LINE_TOTAL
+
+
+def recompute_order_totals(order_ids):
+    """Order.update_total_price() for many orders in a single UPDATE."""
+    totals = (
+        OrderItem.objects
+        .filter(order_id=OuterRef('pk'))
+        .values('order_id')
+        .annotate(total=Sum(LINE_TOTAL))
+        .values('total')
+    )
+    return Order.objects.filter(id__in=order_ids).update(
+        calculated_price=Coalesce(Subquery(totals), Value(0, output_field=MoneyField())),
+        updated_date=timezone.now(),
+    )
+
+
+def _added_date(day):
+    if day == business_date():
+        return timezone.now()
+    return datetime.combine(day, time(12), tzinfo=business_timezone())
+
+
+def save_day_grid(user, day, lines):
+    """
+    Make `user`'s order items on `day` match the grid `lines`
+    ({item_id: (morning_count, evening_count)}).
+
+    Existing rows are diffed by item: changed counts are bulk-updated, new items
+    bulk-inserted (into the day's existing order, or a new one), and rows that are
+    missing from the grid, zeroed or duplicated are deleted. Per-row signals are
+    bypassed, so order totals, the ledger and the day index are updated once at the end.
+    """
+    with transaction.atomic():
+        existing = list(
+            OrderItem.objects
+            .select_for_update()
+            .filter(order__created_user=user, local_date=day)
+            .order_by('id')
+        )
+
+        by_item, to_delete = {}, []
+        for row in existing:
+            if row.item_id in by_item:
+                to_delete.append(row.id)  # duplicate line for the same item
+            else:
+                by_item[row.item_id] = row
+
+        to_update = []
+        for item_id, row in by_item.items():
+            morning, evening = lines.get(item_id, (0, 0))
+            if not morning and not evening:
+                to_delete.append(row.id)
+            elif (row.morning_count, row.evening_count) != (morning, evening):
+                row.morning_count, row.evening_count = morning, evening
+                to_update.append(row)
+
+        new_lines = {
+            item_id: counts for item_id, counts in lines.items()
+            if item_id not in by_item and any(counts)
+        }
+        to_create = []
+        if new_lines:
+            added_date = _added_date(day)
+            if existing:
+                order_id = existing[-1].order_id
+            else:
+                order_id = Order.objects.create(
+                    created_user=user, calculated_price=0, created_date=added_date
+                ).id
+            prices = dict(Item.objects.filter(id__in=new_lines).values_list('id', 'item_price'))
+            to_create = [
+                OrderItem(
+                    order_id=order_id,
+                    item_id=item_id,
+                    morning_count=morning,
+                    evening_count=evening,
+                    added_date=added_date,
+                    price=prices[item_id],
+                )
+                for item_id, (morning, evening) in new_lines.items()
+            ]
+
+        if to_delete:
+            with connection.cursor() as cursor:
+                raw_delete(cursor, OrderItem, OrderItem._meta.pk.column, to_delete)
+        if to_update:
+            OrderItem.objects.bulk_update(to_update, ['morning_count', 'evening_count'])
+        if to_create:
+            OrderItem.objects.bulk_create(to_create)
+
+        order_ids = {row.order_id for row in existing} | {row.order_id for row in to_create}
+        if to_delete or to_update or to_create:
+            recompute_order_totals(order_ids)
+            sync_orders(order_ids)
+            rebuild_days([(user.id, day)])
+
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'deleted': len(to_delete),
+        'order_ids': sorted(order_ids),
+    }
@@ -0,0 +1,78 @@
+# expense_app/purge.py
+from django.db import connection, transaction
+
+from .models import Order, OrderItem, Transaction, TransactionOrder
+from .ledger import sync_orders
+from .order_days import days_for_orders, rebuild_days
+from .settlement import recompute_settlement_totals
+
+CHUNK_SIZE = 500
+
+
+def _chunks(ids, size=CHUNK_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def raw_delete(cursor, model, column, ids):
+    """DELETE FROM <table> WHERE <column> IN (...) without the ORM collector or signals."""
+    qn = connection.ops.quote_name
+    deleted = 0
+    for chunk in _chunks(ids):
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(
+            f"DELETE FROM {qn(model._meta.db_table)} WHERE {qn(column)} IN ({placeholders})",
+            chunk,
+        )
+        deleted += cursor.rowcount
+    return deleted
+
+
+def purge_orders_by_date_user(username, date, dry_run=False):
+    """
+    Delete every order of `username` that has an item on `date`, together with
+    its order items and transaction links, using set-based DELETEs.
+
+    The per-row post_delete signals (order total recompute, day index, ledger) are
+    skipped; the day index, ledger and pending settlement totals are updated once
+    for the affected rows instead.
+    Returns the number of rows removed (or that would be removed on a dry run).
+    """
+    order_ids = list(
+        Order.objects.filter(
+            created_user__username=username,
+            orderitem__local_date=date,
+        ).values_list('id', flat=True).distinct()
+    )
+
+    if dry_run:
+        return {
+            'orders': len(order_ids),
+            'order_items': OrderItem.objects.filter(order_id__in=order_ids).count(),
+            'transaction_orders': TransactionOrder.objects.filter(order_id__in=order_ids).count(),
+        }
+
+    with transaction.atomic():
+        affected_days = days_for_orders(order_ids)
+        # Completed settlements keep their paid total
+        pending_settlements = list(
+            TransactionOrder.objects.filter(
+                order_id__in=order_ids, transaction__is_settlement=True,
+            ).exclude(transaction__status=Transaction.StatusChoices.COMPLETED)
+            .values_list('transaction_id', flat=True).distinct()
+        )
+        with connection.cursor() as cursor:
+            counts = {
+                'order_items': raw_delete(
+                    cursor, OrderItem, OrderItem._meta.get_field('order').column, order_ids
+                ),
+                'transaction_orders': raw_delete(
+                    cursor, TransactionOrder, TransactionOrder._meta.get_field('order_id').column, order_ids
+                ),
+                'orders': raw_delete(cursor, Order, Order._meta.pk.column, order_ids),
+            }
+        rebuild_days(affected_days)
+        sync_orders(order_ids)  # reverses the deleted orders' ledger entries
+        recompute_settlement_totals(pending_settlements)
+
+    return counts
@@ -0,0 +1,43 @@
+# expense_app/query_guard.py
+"""
+Debug/test guard against serializers that lazy-load relations.
+
+Serializers using QueryGuardMixin must be given fully select_related /
+prefetch_related instances: with settings.SERIALIZER_QUERY_GUARD on, any SQL
+run while such a serializer builds its representation raises LazyLoadError
+instead of silently turning a list endpoint into N+1 queries.
+"""
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+class LazyLoadError(AssertionError):
+    pass
+
+
+def _blocker(label):
+    def block(execute, sql, params, many, context):
+        raise LazyLoadError(
+            f"{label} ran a query while serializing; select_related/prefetch_related "
+            f"the queryset instead. SQL: {sql}"
+        )
+    return block
+
+
+@contextmanager
+def forbid_queries(label):
+    if not getattr(settings, 'SERIALIZER_QUERY_GUARD', False):
+        yield
+        return
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(_blocker(label)))
+        yield
+
+
+class QueryGuardMixin:
+    def to_representation(self, instance):
+        with forbid_queries(type(self).__name__):
+            return super().to_representation(instance)
@@ -0,0 +1,85 @@
+# expense_app/renderers.py
+"""
+MessagePack support for the API (`Accept: application/msgpack` /
+`Content-Type: application/msgpack`).
+
+Dates are sent as extension types instead of ISO strings:
+  * datetime -> the standard msgpack Timestamp extension (-1), UTC
+  * date     -> extension 1, days since 1970-01-01 as a big-endian int32
+Decimals are sent as floats, the same as DRF's JSON encoder does.
+"""
+import datetime
+import decimal
+import struct
+import uuid
+
+import msgpack
+from django.utils import timezone
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+DATE_EXT_TYPE = 1
+EPOCH_DATE = datetime.date(1970, 1, 1)
+_DAYS = struct.Struct('>i')
+
+
+def _encode(obj):
+    if isinstance(obj, datetime.datetime):
+        if timezone.is_naive(obj):
+            obj = timezone.make_aware(obj)
+        return msgpack.Timestamp.from_datetime(obj)
+    if isinstance(obj, datetime.date):
+        return msgpack.ExtType(DATE_EXT_TYPE, _DAYS.pack((obj - EPOCH_DATE).days))
+    if isinstance(obj, datetime.time):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (uuid.UUID, Promise)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)) or hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
+
+def _decode_ext(code, data):
+    if code == DATE_EXT_TYPE:
+        return EPOCH_DATE + datetime.timedelta(days=_DAYS.unpack(data)[0])
+    return msgpack.ExtType(code, data)
+
+
+def packb(data):
+    return msgpack.packb(data, default=_encode, use_bin_type=True)
+
+
+def unpackb(payload):
+    # timestamp=3 -> aware UTC datetimes, which DRF's DateTimeField accepts as is
+    return msgpack.unpackb(payload, raw=False, timestamp=3, ext_hook=_decode_ext, strict_map_key=False)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = MSGPACK_MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    # Fast paths (row_encoders) may hand over date/datetime objects instead of strings
+    native_dates = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return packb(data)
+
+
+class MessagePackParser(BaseParser):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return unpackb(stream.read())
+        except (ValueError, TypeError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc or type(exc).__name__}')
@@ -0,0 +1,272 @@
+# expense_app/reports.py
+"""
+SQL-side aggregation for the reporting endpoints.
+
+    rows = (
+        OrderItemReport()
+        .filter(start_date='2025-07-01', user='john')
+        .group_by('day', 'item')
+        .rows()
+    )
+
+Every grouping and sum runs in the database; results come back as small
+named tuples (one field per dimension plus the requested measures).
+"""
+from collections import namedtuple
+from datetime import date as Date
+from decimal import Decimal
+from typing import Iterable, List, NamedTuple, Optional
+
+from django.db.models import DateField, F, Func, IntegerField, Min, Sum, Window
+from django.db.models.functions import Lag, RowNumber, Trunc, TruncMonth, TruncWeek
+
+from .fields import MoneyField
+from .models import Expense, OrderItem, TransactionOrder
+
+# Stored generated columns on OrderItem (line_total uses the price snapshot taken at order time)
+ITEM_COUNT = F('total_count')
+LINE_TOTAL = F('line_total')
+
+# dimension -> {row field: expression}
+# Days are business days (BUSINESS_TIME_ZONE): the stored, indexed local_date column
+DIMENSIONS = {
+    'day': {'date': F('local_date')},
+    'week': {'week': TruncWeek('local_date', output_field=DateField())},
+    'month': {'month': TruncMonth('local_date', output_field=DateField())},
+    'user': {'user': F('order__created_user__username')},
+    'item': {'item_id': F('item_id'), 'item_name': F('item__item_name'), 'price': F('item__item_price')},
+    'category': {'category_id': F('item__category_id'), 'category_name': F('item__category__category_name')},
+}
+
+MEASURES = {
+    'total_count': Sum(ITEM_COUNT, output_field=IntegerField()),
+    'total_amount': Sum(LINE_TOTAL, output_field=MoneyField()),
+    'first_id': Min('id'),
+    'order_id': Min('order_id'),
+    'first_user': Min('order__created_user__username'),
+}
+
+_row_types = {}
+
+
+def _row_type(fields):
+    if fields not in _row_types:
+        _row_types[fields] = namedtuple('ReportRow', fields)
+    return _row_types[fields]
+
+
+class OrderItemReport:
+    """Composable, immutable query builder over OrderItem."""
+
+    def __init__(self, queryset=None, dimensions=(), measures=('total_count', 'total_amount'), descending=False):
+        self.queryset = OrderItem.objects.all() if queryset is None else queryset
+        self.dimensions = tuple(dimensions)
+        self.measures = tuple(measures)
+        self.descending = descending
+
+    def _clone(self, **changes):
+        state = {
+            'queryset': self.queryset,
+            'dimensions': self.dimensions,
+            'measures': self.measures,
+            'descending': self.descending,
+        }
+        state.update(changes)
+        return OrderItemReport(**state)
+
+    def filter(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        date: Optional[str] = None,
+        month: Optional[str] = None,
+        user: Optional[str] = None,
+        item: Optional[int] = None,
+        item_name: Optional[str] = None,
+        category: Optional[int] = None,
+        **lookups,
+    ) -> 'OrderItemReport':
+        qs = self.queryset
+        # Plain comparisons on local_date so the index is used (no per-row date function)
+        if start_date:
+            qs = qs.filter(local_date__gte=start_date)
+        if end_date:
+            qs = qs.filter(local_date__lte=end_date)
+        if date:
+            qs = qs.filter(local_date=date)
+        if month:
+            try:
+                first = Date(int(month[:4]), int(month[5:7]), 1)
+            except (ValueError, IndexError):
+                pass
+            else:
+                following = Date(first.year + first.month // 12, first.month % 12 + 1, 1)
+                qs = qs.filter(local_date__gte=first, local_date__lt=following)
+        if user:
+            qs = qs.filter(order__created_user__username=user)
+        if item:
+            qs = qs.filter(item_id=item)
+        if item_name:
+            qs = qs.filter(item__item_name=item_name)
+        if category:
+            qs = qs.filter(item__category_id=category)
+        if lookups:
+            qs = qs.filter(**lookups)
+        return self._clone(queryset=qs)
+
+    def group_by(self, *dimensions: str) -> 'OrderItemReport':
+        unknown = set(dimensions) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown report dimension(s): {', '.join(sorted(unknown))}")
+        return self._clone(dimensions=dimensions)
+
+    def measure(self, *measures: str) -> 'OrderItemReport':
+        return self._clone(measures=measures)
+
+    def newest_first(self) -> 'OrderItemReport':
+        return self._clone(descending=True)
+
+    def _grouped(self):
+        # Annotations are aliased so row names like `price` or `item_id` can't clash with model fields
+        columns = {}
+        for dimension in self.dimensions:
+            columns.update(DIMENSIONS[dimension])
+        aliases = {f'report_{name}': expression for name, expression in columns.items()}
+        measures = {f'report_{name}': MEASURES[name] for name in self.measures}
+        ordering = [f'-{alias}' if self.descending else alias for alias in aliases]
+        qs = (
+            self.queryset
+            .annotate(**aliases)
+            .values(*aliases)
+            .annotate(**measures)
+            .order_by(*ordering)
+            .values_list(*aliases, *measures)
+        )
+        if not measures:
+            qs = qs.distinct()
+        return qs, tuple(columns) + self.measures
+
+    def values_list(self):
+        """Grouped queryset returning plain tuples, for slicing/counting in SQL."""
+        return self._grouped()[0]
+
+    def rows(self) -> List[tuple]:
+        qs, fields = self._grouped()
+        row_type = _row_type(fields)
+        return [row_type(*values) for values in qs]
+
+
+class DailyTotal(NamedTuple):
+    date: object
+    order_total: Decimal
+    expense_total: Decimal
+    combined_total: Decimal
+
+
+def expense_totals_by_day() -> Iterable[tuple]:
+    return (
+        TransactionOrder.objects
+        .filter(expense__isnull=False)
+        .values(date=F('local_date'))
+        .annotate(expense_total=Sum('expense__amount'))
+        .order_by('date')
+        .values_list('date', 'expense_total')
+    )
+
+
+def combined_daily_totals() -> List[DailyTotal]:
+    """Regular (order item) and other (expense) totals per day, merged on date."""
+    order_totals = dict(OrderItemReport().group_by('day').measure('total_amount').values_list())
+    expense_totals = dict(expense_totals_by_day())
+
+    rows = []
+    for day in sorted(order_totals.keys() | expense_totals.keys()):
+        order_total = order_totals.get(day) or 0
+        expense_total = expense_totals.get(day) or 0
+        rows.append(DailyTotal(day, order_total, expense_total, order_total + expense_total))
+    return rows
+
+
+# Spend analytics (window functions)
+
+PERIODS = ('day', 'week', 'month')
+
+
+class WindowSum(Func):
+    """SUM(...) OVER (...) over an already aggregated column (Sum() refuses aggregate input)."""
+    function = 'SUM'
+    window_compatible = True
+
+
+# The window columns must stay plain annotations: a trailing values_list() or an
+# expression built on top of a window pushes them into GROUP BY. So the helpers
+# return dict rows and the period-over-period change is derived from the LAG column.
+def _trend_windows(total, partition):
+    """Running total and previous period total per partition, ordered by period."""
+    window = {'partition_by': [F(partition)], 'order_by': F('period').asc()}
+    return {
+        'running_total': Window(WindowSum(F(total), output_field=MoneyField()), **window),
+        'previous_total': Window(Lag(F(total)), **window),
+    }
+
+
+def _with_change(rows):
+    for row in rows:
+        previous = row['previous_total']
+        row['change'] = None if previous is None else row['total'] - previous
+        yield row
+
+
+def category_spend_trend(report: OrderItemReport, period: str = 'month'):
+    """Per period and category: total, running total, previous total and change, in one query."""
+    return _with_change(
+        report.queryset
+        .annotate(
+            period=Trunc('local_date', period, output_field=DateField()),
+            category=F('item__category_id'),
+            category_label=F('item__category__category_name'),
+        )
+        .values('period', 'category', 'category_label')
+        .annotate(total=Sum(LINE_TOTAL, output_field=MoneyField()))
+        .annotate(**_trend_windows('total', 'category'))
+        .order_by('category', 'period')
+    )
+
+
+def expense_type_spend_trend(period: str = 'month', start_date=None, end_date=None, user=None):
+    """Same trend columns for other expenses, split by Expense.expense_type."""
+    expenses = Expense.objects.all()
+    if start_date:
+        expenses = expenses.filter(date__gte=start_date)
+    if end_date:
+        expenses = expenses.filter(date__lte=end_date)
+    if user:
+        expenses = expenses.filter(user__username=user)
+    return _with_change(
+        expenses
+        .annotate(period=Trunc('date', period, output_field=DateField()))
+        .values('period', 'expense_type')
+        .annotate(total=Sum('amount'))
+        .annotate(**_trend_windows('total', 'expense_type'))
+        .order_by('expense_type', 'period')
+    )
+
+
+def top_items_per_category(report: OrderItemReport, limit: int = 5):
+    """The `limit` highest-spend items of every category, ranked with ROW_NUMBER()."""
+    return (
+        report.queryset
+        .annotate(
+            category=F('item__category_id'),
+            category_label=F('item__category__category_name'),
+            item_label=F('item__item_name'),
+        )
+        .values('category', 'category_label', 'item', 'item_label')
+        .annotate(
+            total_count=Sum(ITEM_COUNT, output_field=IntegerField()),
+            total=Sum(LINE_TOTAL, output_field=MoneyField()),
+        )
+        .annotate(rank=Window(RowNumber(), partition_by=[F('category')], order_by=F('total').desc()))
+        .filter(rank__lte=limit)
+        .order_by('category', 'rank')
+    )
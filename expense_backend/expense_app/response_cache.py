@@ -0,0 +1,79 @@
+# expense_app/response_cache.py
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+from .db_router import current_read_alias
+
+
+def _version_key(namespace):
+    return f"response-cache:{namespace}:version"
+
+
+def get_version(namespace):
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        # First use (or evicted): start a fresh version so old bodies are never reused
+        cache.add(_version_key(namespace), 1, timeout=None)
+        version = cache.get(_version_key(namespace), 1)
+    return version
+
+
+def bump_version(namespace):
+    """Invalidate every cached response of a namespace."""
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.add(_version_key(namespace), 1, timeout=None)
+
+
+def _query_fingerprint(request):
+    params = sorted(request.query_params.lists())
+    raw = "&".join(f"{key}={','.join(values)}" for key, values in params)
+    # JSON and MessagePack bodies of the same resource must not share an ETag
+    media_type = getattr(request, 'accepted_media_type', '')
+    return hashlib.md5(f"{request.path}?{raw}|{media_type}".encode()).hexdigest()
+
+
+def _body_etag(namespace, version, fingerprint, data):
+    body = json.dumps(data, sort_keys=True, default=str)
+    digest = hashlib.md5(f"{fingerprint}|{body}".encode()).hexdigest()
+    return f'"{namespace}-{version}-{digest[:16]}"'
+
+
+def cached_response(request, namespace, build_data):
+    """
+    Serve a GET from the versioned cache.
+
+    The ETag is a hash of the cached body (and the query), stored next to it,
+    so a client holding the current ETag gets a 304 without the body being
+    rebuilt or sent. A body built from a lagging replica is only cached for
+    the stickiness window; once it is rebuilt from fresh data the ETag
+    changes with it, so clients never keep a stale body alive through 304s.
+    `build_data` is only called on a cache miss.
+    """
+    version = get_version(namespace)
+    fingerprint = _query_fingerprint(request)
+
+    key = f"response-cache:{namespace}:{version}:{fingerprint}:entry"
+    entry = cache.get(key)
+    if entry is None:
+        data = build_data()
+        entry = (_body_etag(namespace, version, fingerprint, data), data)
+        # A body built from a lagging replica is only trusted for the stickiness window
+        timeout = settings.REPLICA_STICKY_SECONDS if current_read_alias() else settings.RESPONSE_CACHE_TIMEOUT
+        cache.set(key, entry, timeout=timeout)
+    etag, data = entry
+
+    if etag in request.headers.get("If-None-Match", ""):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response["ETag"] = etag
+    patch_vary_headers(response, ["Accept"])
+    return response
@@ -0,0 +1,178 @@
+# expense_app/row_encoders.py
+"""
+Fast path for read-only list endpoints.
+
+Rows come straight from values_list() and are turned into the same dicts the
+ModelSerializers produce (same keys, order and value formatting), so the JSON
+output is byte-for-byte identical while skipping per-object field machinery.
+Keep these specs in step with serializers.py.
+
+With native=True (the negotiated renderer sets `native_dates`, e.g. MessagePack)
+date and datetime columns are passed through untouched so the renderer can
+encode them compactly instead of as strings.
+"""
+from operator import itemgetter
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .models import OrderItem
+
+
+class RowEncoder:
+    """
+    Precompiled mapping from values_list() tuples to output dicts.
+
+    Each field is (output key, source column(s), converter). With no converter the
+    column value is copied as is; with a converter it receives the column value(s).
+    """
+
+    def __init__(self, *fields, native=False):
+        self.columns = []
+        self._plan = [
+            (key, self._getter(columns, None if native and convert in DATE_CONVERTERS else convert))
+            for key, columns, convert in fields
+        ]
+
+    def _index(self, column):
+        if column not in self.columns:
+            self.columns.append(column)
+        return self.columns.index(column)
+
+    def _getter(self, columns, convert):
+        """Compile one field into a single `row -> value` callable."""
+        if isinstance(columns, str):
+            columns = (columns,)
+        indexes = [self._index(column) for column in columns]
+        if not indexes:
+            return lambda row: convert()
+        if len(indexes) == 1:
+            index = indexes[0]
+            if convert is None:
+                return itemgetter(index)
+            return lambda row: convert(row[index])
+        pick = itemgetter(*indexes)
+        return lambda row: convert(*pick(row))
+
+    def encode(self, row):
+        return {key: get(row) for key, get in self._plan}
+
+    def encode_all(self, queryset):
+        encode = self.encode
+        return [encode(row) for row in queryset.values_list(*self.columns)]
+
+
+# Value formatting, mirroring the DRF fields the serializers use
+
+ORDER_ITEM_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+
+def iso_datetime(value):
+    """serializers.DateTimeField with the default ISO-8601 format."""
+    if not value:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def order_item_datetime(value):
+    """OrderItemSerializer.added_date: DateTimeField(format=ORDER_ITEM_DATE_FORMAT)."""
+    if not value:
+        return None
+    return value.astimezone(timezone.get_current_timezone()).strftime(ORDER_ITEM_DATE_FORMAT)
+
+
+def iso_date(value):
+    return value.isoformat() if value else None
+
+
+# Converters skipped when the renderer takes native date/datetime values
+DATE_CONVERTERS = {iso_datetime, order_item_datetime, iso_date}
+
+
+def file_url(request):
+    """serializers.FileField / the *_url SerializerMethodFields: absolute URL when a request is known."""
+    def convert(name):
+        if not name:
+            return None
+        url = default_storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+def order_item_encoder(native=False):
+    """OrderItemSerializer"""
+    return RowEncoder(
+        ('id', 'id', None),
+        ('item', 'item_id', None),
+        ('count', 'total_count', None),
+        ('added_date', 'added_date', order_item_datetime),
+        ('order', 'order_id', None),
+        native=native,
+    )
+
+
+def expense_encoder(request=None, native=False):
+    """ExpenseSerializer"""
+    bill = file_url(request)
+    return RowEncoder(
+        ('id', 'id', None),
+        ('user', ('user__id', 'user__username', 'user__name', 'user__email'),
+         lambda id, username, name, email: {'id': id, 'username': username, 'name': name, 'email': email}),
+        ('date', 'date', iso_date),
+        ('description', 'description', None),
+        ('expense_type', 'expense_type', None),
+        ('bill', 'bill', bill),
+        ('bill_url', 'bill', bill),
+        ('amount', 'amount', None),
+        ('is_verified', 'is_verified', None),
+        ('is_refunded', 'is_refunded', None),
+        ('created_date', 'created_date', iso_datetime),
+        ('updated_date', 'updated_date', iso_datetime),
+        ('total_count', (), lambda: 1),
+        ('total_amount', 'amount', lambda amount: amount or 0),
+        native=native,
+    )
+
+
+def order_encoder(native=False):
+    """OrderSerializer, without the nested order_items (attached by encode_orders)."""
+    return RowEncoder(
+        ('id', 'id', None),
+        ('created_user', 'created_user_id', None),
+        ('calculated_price', 'calculated_price', None),
+        ('created_date', 'created_date', iso_datetime),
+        native=native,
+    )
+
+
+def wants_native(request):
+    """True when the renderer negotiated for this request encodes dates itself."""
+    return getattr(getattr(request, 'accepted_renderer', None), 'native_dates', False)
+
+
+def encode_order_items(queryset, native=False):
+    return order_item_encoder(native).encode_all(queryset)
+
+
+def encode_expenses(queryset, request=None):
+    return expense_encoder(request, wants_native(request)).encode_all(queryset)
+
+
+def encode_orders(queryset, native=False):
+    """Orders plus their items in two queries, grouped in one pass."""
+    orders = order_encoder(native).encode_all(queryset)
+    by_id = {}
+    for order in orders:
+        order['order_items'] = []
+        by_id[order['id']] = order['order_items']
+
+    if by_id:
+        items = order_item_encoder(native).encode_all(
+            OrderItem.objects.filter(order_id__in=queryset.values('id')).order_by('id')
+        )
+        for item in items:
+            by_id[item['order']].append(item)
+    return orders
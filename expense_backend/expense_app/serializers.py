@@ -1,8 +1,32 @@
+from decimal import ROUND_HALF_UP
+
 from rest_framework import serializers
 from .models import *
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth.hashers import make_password
 from rest_framework.exceptions import AuthenticationFailed
+from .query_guard import QueryGuardMixin
+from .fields import MoneyField
+
+
+class MoneyAmountField(serializers.DecimalField):
+    """MoneyField in the API: plain number out (as the old float fields were), rounded to paise in."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_digits', 17)
+        kwargs.setdefault('decimal_places', 2)
+        kwargs.setdefault('coerce_to_string', False)
+        kwargs.setdefault('rounding', ROUND_HALF_UP)
+        super().__init__(**kwargs)
+
+
+class MoneyModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer that maps MoneyField model fields to MoneyAmountField."""
+
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        MoneyField: MoneyAmountField,
+    }
 
 
 class RoleSerializer(serializers.ModelSerializer):
@@ -38,7 +62,7 @@ class UserSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(MoneyModelSerializer):
     class Meta:
         model = Item
         fields = '__all__'
@@ -50,7 +74,7 @@ class ItemSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ItemPriceHistorySerializer(serializers.ModelSerializer):
+class ItemPriceHistorySerializer(MoneyModelSerializer):
     item_name = serializers.CharField(source='item.item_name', read_only=True)
 
     class Meta:
@@ -65,7 +89,7 @@ class ExpenseUserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'name', 'email']
 
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(MoneyModelSerializer):
     user = ExpenseUserSerializer(read_only=True)
     bill_url = serializers.SerializerMethodField()
     total_count = serializers.SerializerMethodField()
@@ -123,9 +147,9 @@ class BillSerializer(serializers.ModelSerializer):
         return None
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(QueryGuardMixin, MoneyModelSerializer):
     item = serializers.PrimaryKeyRelatedField(queryset=Item.objects.all())
-    count = serializers.SerializerMethodField()
+    count = serializers.IntegerField(source='total_count', read_only=True)
     added_date = serializers.DateTimeField(
         format="%Y-%m-%dT%H:%M:%S.%fZ",
         input_formats=[
@@ -142,10 +166,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
         model = OrderItem
         fields = ['id', 'item', 'count', 'added_date', 'order']
 
-    def get_count(self, obj):
-        return (obj.morning_count or 0) + (obj.evening_count or 0)
-
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(QueryGuardMixin, MoneyModelSerializer):
     order_items = OrderItemSerializer(many=True, source='orderitem_set')
 
     class Meta:
@@ -170,11 +191,48 @@ class OrderSerializer(serializers.ModelSerializer):
         return order
 
 
-class TransactionSerializer(serializers.ModelSerializer):
+class DayGridLineSerializer(serializers.Serializer):
+    item = serializers.IntegerField()
+    morning_count = serializers.IntegerField(min_value=0, default=0)
+    evening_count = serializers.IntegerField(min_value=0, default=0)
+
+
+class DayGridSerializer(serializers.Serializer):
+    """Body of PUT /order-items/day/: one user's full morning/evening grid for a date."""
+    date = serializers.DateField()
+    user = serializers.CharField(required=False, help_text="Username (admins only); defaults to the caller.")
+    items = DayGridLineSerializer(many=True)
+
+    def validate_items(self, items):
+        item_ids = [line['item'] for line in items]
+        if len(set(item_ids)) != len(item_ids):
+            raise serializers.ValidationError("Each item may appear only once in the grid.")
+        missing = set(item_ids) - set(Item.objects.filter(id__in=item_ids).values_list('id', flat=True))
+        if missing:
+            raise serializers.ValidationError(f"Unknown item ids: {sorted(missing)}")
+        return items
+
+
+class TransactionSerializer(MoneyModelSerializer):
     class Meta:
         model = Transaction
         fields = '__all__'
-        read_only_fields = ['user', 'created_date']
+        read_only_fields = ['user', 'created_date', 'is_settlement']
+        # The settlement uniqueness (one per user and period) is enforced by settle_period
+        # and the database; DRF's generated validator can't evaluate its condition here
+        validators = []
+
+
+class SettlementSerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    user = serializers.ListField(child=serializers.IntegerField(), required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("start_date must not be after end_date.")
+        return data
 
 
 class TransactionOrderSerializer(serializers.ModelSerializer):
@@ -184,13 +242,20 @@ class TransactionOrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_date']
 
 
+class LedgerEntrySerializer(MoneyModelSerializer):
+    class Meta:
+        model = LedgerEntry
+        fields = ['id', 'kind', 'source_id', 'amount', 'balance_after', 'created_date']
+
+
 class NotificationSerializer(serializers.ModelSerializer):
+    message = serializers.CharField(read_only=True)  # rendered from the event's template
     created_at = serializers.DateTimeField(source='created_date')
 
     class Meta:
         model = Notification
         fields = ['id', 'message', 'is_read', 'created_at']
-        read_only_fields = ['user', 'created_at']
+        read_only_fields = ['created_at']
 
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
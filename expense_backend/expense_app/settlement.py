@@ -0,0 +1,160 @@
+# expense_app/settlement.py
+"""
+Period settlement: one Transaction per user covering everything of theirs in
+the period that has not been settled yet.
+
+For a period (business days `start`..`end`, inclusive) a user's settlement
+groups
+  - their orders created in the period, except the shadow orders that
+    expense_list_create / the importer create for an expense, and
+  - their verified, unrefunded expenses dated in the period,
+that are not linked to any settlement yet. The settlement's total_price is
+what the user owes: orders minus expenses (negative when they are owed).
+
+Grouping and totals run in SQL; settlements and links are bulk-created. The
+run is idempotent: a rerun for the same period reuses each user's settlement
+(unique per user and period), links only what is still unsettled and
+recomputes the totals. Completed settlements are closed and left alone.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .fields import MoneyField, business_timezone
+from .models import Expense, Order, Transaction, TransactionOrder
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+
+
+def period_bounds(start, end):
+    """[from_date, to_date) datetimes of the business days start..end."""
+    tz = business_timezone()
+    return (
+        datetime.combine(start, time.min, tzinfo=tz),
+        datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz),
+    )
+
+
+def unsettled_orders(from_date, to_date):
+    settled = TransactionOrder.objects.filter(order_id=OuterRef('pk'), transaction__is_settlement=True)
+    for_expense = TransactionOrder.objects.filter(order_id=OuterRef('pk'), expense__isnull=False)
+    return Order.objects.filter(
+        created_date__gte=from_date, created_date__lt=to_date, created_user__isnull=False,
+    ).filter(~Exists(settled), ~Exists(for_expense))
+
+
+def unsettled_expenses(start, end):
+    settled = TransactionOrder.objects.filter(expense=OuterRef('pk'), transaction__is_settlement=True)
+    return Expense.objects.filter(
+        date__gte=start, date__lte=end, is_verified=True, is_refunded=False,
+    ).filter(~Exists(settled))
+
+
+def _per_user(queryset, user_field, amount_field):
+    return {
+        row[user_field]: (row['n'], row['total'])
+        for row in queryset.values(user_field).annotate(n=Count('id'), total=Sum(amount_field)).order_by()
+    }
+
+
+def recompute_settlement_totals(transaction_ids):
+    """total_price = linked orders - linked expenses, for many settlements in one UPDATE."""
+    links = TransactionOrder.objects.filter(transaction=OuterRef('pk')).values('transaction')
+    orders = links.filter(expense__isnull=True).annotate(total=Sum('order_id__calculated_price')).values('total')
+    expenses = links.filter(expense__isnull=False).annotate(total=Sum('expense__amount')).values('total')
+    zero = Value(0, output_field=MoneyField())
+    return Transaction.objects.filter(id__in=transaction_ids).update(
+        total_price=Coalesce(Subquery(orders), zero) - Coalesce(Subquery(expenses), zero),
+    )
+
+
+def _link(rows, settlement_ids, field):
+    """Bulk-create links for (object id, user id) rows; returns how many were created."""
+    created, batch = 0, []
+    for object_id, user_id in rows:
+        transaction_id = settlement_ids.get(user_id)
+        if transaction_id is None:
+            continue  # user's settlement is already completed
+        batch.append(TransactionOrder(transaction_id=transaction_id, **{field: object_id}))
+        if len(batch) >= BATCH_SIZE:
+            created += len(TransactionOrder.objects.bulk_create(batch))
+            batch = []
+    if batch:
+        created += len(TransactionOrder.objects.bulk_create(batch))
+    return created
+
+
+def settle_period(start, end, users=None, dry_run=False):
+    """
+    Settle every user's unsettled orders and expenses for business days
+    start..end. `users` optionally restricts the run to some user ids.
+    Returns a summary; on a dry run nothing is written.
+    """
+    if start > end:
+        raise ValueError("start must not be after end.")
+    from_date, to_date = period_bounds(start, end)
+
+    orders = unsettled_orders(from_date, to_date)
+    expenses = unsettled_expenses(start, end)
+    if users is not None:
+        orders = orders.filter(created_user_id__in=users)
+        expenses = expenses.filter(user_id__in=users)
+
+    summary = {
+        'start_date': start, 'end_date': end, 'dry_run': dry_run,
+        'users': 0, 'settlements_created': 0, 'skipped_completed': 0,
+        'orders': 0, 'expenses': 0, 'total': 0,
+    }
+
+    with transaction.atomic():
+        order_totals = _per_user(orders, 'created_user', 'calculated_price')
+        expense_totals = _per_user(expenses, 'user', 'amount')
+        user_ids = set(order_totals) | set(expense_totals)
+        if not user_ids:
+            return summary
+
+        existing = Transaction.objects.select_for_update().filter(
+            is_settlement=True, from_date=from_date, to_date=to_date, user_id__in=user_ids,
+        )
+        completed = set(existing.filter(status=Transaction.StatusChoices.COMPLETED).values_list('user_id', flat=True))
+        user_ids -= completed
+        summary['skipped_completed'] = len(completed)
+        summary['users'] = len(user_ids)
+        summary['orders'] = sum(order_totals[u][0] for u in user_ids if u in order_totals)
+        summary['expenses'] = sum(expense_totals[u][0] for u in user_ids if u in expense_totals)
+        summary['total'] = (
+            sum(order_totals[u][1] for u in user_ids if u in order_totals)
+            - sum(expense_totals[u][1] for u in user_ids if u in expense_totals)
+        )
+        if dry_run or not user_ids:
+            return summary
+
+        have = set(existing.values_list('user_id', flat=True))
+        remarks = f"Settlement {start.isoformat()} to {end.isoformat()}"
+        Transaction.objects.bulk_create(
+            [
+                Transaction(
+                    user_id=user_id, total_price=0, status=Transaction.StatusChoices.PENDING,
+                    from_date=from_date, to_date=to_date, remarks=remarks, is_settlement=True,
+                )
+                for user_id in sorted(user_ids - have)
+            ],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,  # a concurrent run created it; picked up below
+        )
+        settlement_ids = dict(
+            existing.filter(status=Transaction.StatusChoices.PENDING).values_list('user_id', 'id')
+        )
+        summary['settlements_created'] = len(settlement_ids.keys() - have)
+
+        _link(orders.values_list('id', 'created_user_id').iterator(chunk_size=BATCH_SIZE), settlement_ids, 'order_id_id')
+        _link(expenses.values_list('id', 'user_id').iterator(chunk_size=BATCH_SIZE), settlement_ids, 'expense_id')
+        recompute_settlement_totals(settlement_ids.values())
+
+    logger.info("Settlement finished", extra={key: summary[key] for key in ('users', 'orders', 'expenses', 'settlements_created')})
+    return summary
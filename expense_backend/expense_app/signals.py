@@ -1,7 +1,15 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import Item, ItemPriceHistory
+from .models import (
+    Item, ItemPriceHistory, Category, Role, OrderItem, Expense, Order, Transaction, TransactionOrder,
+    Notification, NotificationTemplate, User,
+)
+from .response_cache import bump_version
+from .order_days import add_to_day, order_day
+from .ledger import sync_expenses, sync_orders, sync_transactions
+from .notifications import change_unread, forget_templates
+from .ws_auth import invalidate_user
 
 @receiver(pre_save, sender=Item)
 def track_price_change(sender, instance, **kwargs):
@@ -19,3 +27,100 @@ def track_price_change(sender, instance, **kwargs):
             price=original.item_price,  # ✅ use correct field name
             date=timezone.now()         # ✅ use correct field name
         )
+
+
+# Reference data responses are cached per namespace; any write invalidates them
+CACHED_REFERENCE_MODELS = {
+    Category: 'categories',
+    Item: 'items',
+    Role: 'roles',
+    NotificationTemplate: 'notification-templates',  # notifications.templates()
+}
+
+
+def invalidate_reference_cache(sender, **kwargs):
+    bump_version(CACHED_REFERENCE_MODELS[sender])
+
+
+for model in CACHED_REFERENCE_MODELS:
+    post_save.connect(invalidate_reference_cache, sender=model, dispatch_uid=f'cache-{model.__name__}-save')
+    post_delete.connect(invalidate_reference_cache, sender=model, dispatch_uid=f'cache-{model.__name__}-delete')
+
+
+@receiver(post_save, sender=NotificationTemplate)
+@receiver(post_delete, sender=NotificationTemplate)
+def reload_notification_templates(sender, **kwargs):
+    forget_templates()
+
+
+# Keep the OrderItemDay index (available dates) in step with order items
+@receiver(pre_save, sender=OrderItem)
+def remember_order_item_day(sender, instance, **kwargs):
+    instance._previous_day = None
+    if not instance.pk:
+        return
+    previous = (
+        OrderItem.objects.filter(pk=instance.pk)
+        .values_list('order__created_user_id', 'added_date')
+        .first()
+    )
+    if previous:
+        instance._previous_day = (previous[0], order_day(previous[1]))
+
+
+@receiver(post_save, sender=OrderItem)
+def index_order_item_day(sender, instance, created, **kwargs):
+    current = (instance.order.created_user_id, order_day(instance.added_date))
+    previous = getattr(instance, '_previous_day', None)
+    if previous == current:
+        return
+    if previous:
+        add_to_day(*previous, -1)
+    add_to_day(*current, 1)
+
+
+@receiver(post_delete, sender=OrderItem)
+def unindex_order_item_day(sender, instance, **kwargs):
+    add_to_day(instance.order.created_user_id, order_day(instance.added_date), -1)
+
+
+# Ledger: every write that changes what a user owes / is owed appends to their ledger
+# (in the writer's database transaction). Bulk paths call the ledger.sync_* helpers themselves.
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+def ledger_expense(sender, instance, **kwargs):
+    sync_expenses([instance.pk])
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def ledger_order(sender, instance, **kwargs):
+    sync_orders([instance.pk])
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def ledger_transaction(sender, instance, **kwargs):
+    sync_transactions([instance.pk])
+
+
+@receiver(post_save, sender=TransactionOrder)
+@receiver(post_delete, sender=TransactionOrder)
+def ledger_transaction_order(sender, instance, **kwargs):
+    # Linking an order to an expense makes it an expense mirror (and back)
+    sync_orders([instance.order_id_id])
+
+
+# Unread counters for notifications deleted through the ORM (e.g. cascading from an expense);
+# the batched raw deletes of retention / clear-all reconcile instead
+@receiver(post_delete, sender=Notification)
+def unread_notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        change_unread([instance.recipient_id], -1)
+
+
+# WebSocket auth caches users per token; drop those entries when the user changes
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_ws_auth(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
@@ -0,0 +1,81 @@
+# expense_app/tests/test_reports_benchmark.py
+"""
+Benchmarks for the reporting endpoints built on reports.OrderItemReport.
+
+Seeds a small synthetic dataset, then times each view against the report
+query it wraps and checks the view stays at a fixed number of queries,
+however many rows it summarises. Timings are printed (pytest -s).
+"""
+import io
+import time
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from expense_app.models import OrderItem, User
+from expense_app.reports import OrderItemReport, combined_daily_totals
+
+ROUNDS = 5
+
+
+@pytest.fixture(scope='module')
+def seeded():
+    call_command(
+        'seed_data', users=8, admins=1, items=12, days=30, expenses=3, prefix='bench', seed=7, stdout=io.StringIO(),
+    )
+    assert OrderItem.objects.exists()
+    return User.objects.filter(username__startswith='bench').order_by('id').first()
+
+
+@pytest.fixture
+def client(seeded):
+    client = APIClient()
+    client.force_authenticate(seeded)
+    return client
+
+
+def _best_of(run):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _benchmark(client, url, report, queries):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    assert len(captured.captured_queries) == queries, [q['sql'] for q in captured.captured_queries]
+
+    view_ms = _best_of(lambda: client.get(url))
+    report_ms = _best_of(report)
+    print(f"\n{url:<32} view {view_ms:7.2f} ms   report {report_ms:7.2f} ms   {queries} queries")
+    return response.json()
+
+
+def test_daily_summary(client):
+    data = _benchmark(client, '/api/daily-summary/', combined_daily_totals, queries=2)
+    assert data and {'date', 'order_total', 'expense_total', 'combined_total'} <= set(data[0])
+
+
+def test_order_summary(client):
+    report = (
+        OrderItemReport()
+        .filter(order__calculated_price__gt=0)
+        .group_by('day', 'user')
+        .measure('total_count', 'total_amount', 'order_id')
+        .newest_first()
+    )
+    data = _benchmark(client, '/api/order-summary/', report.rows, queries=1)
+    assert len(data) == len(report.rows())
+
+
+def test_orders_grouped_by_date(client):
+    report = OrderItemReport().group_by('day').measure().newest_first()
+    data = _benchmark(client, '/api/orders/grouped-by-date/?page=2&page_size=5', report.rows, queries=3)
+    assert data
@@ -25,6 +25,7 @@ urlpatterns = [
     path('expenses/', views.expense_list_create, name='expense-list-create'),
     path('expenses/<int:pk>/', views.expense_detail, name='expense-detail'),
     path('expenses/mydata/', views.my_expenses, name='my_expenses'),
+    path('expenses/import/', views.expense_import, name='expense-import'),
     
     #profile
     path('update-profile-picture/', views.update_profile_picture, name='update-profile-picture'),
@@ -40,10 +41,13 @@ urlpatterns = [
     # Order Items
     path("order-items/", views.order_item_list, name="order-item-list"),
     path("order-items/<int:pk>/", views.order_item_detail, name="order-item-detail"),
+    path("order-items/day/", views.order_items_day, name="order-items-day"),
 
     # Transactions
     path('transactions/', views.transaction_list_create, name='transaction-list-create'),
     path('transactions/<int:pk>/', views.transaction_detail, name='transaction-detail'),
+    path('transactions/settle/', views.transaction_settle, name='transaction-settle'),
+    path('balance/', views.balance_view, name='balance'),
     
     # Notifications
     path('notifications/', views.notification_list, name='notification-list'),
@@ -65,4 +69,7 @@ urlpatterns = [
 
     path('orders/grouped-by-date/', views.order_items_grouped_by_date, name='order-items-grouped-by-date'),
     path('orders/available-dates/', views.available_dates, name='available-dates'),
+
+    # Spend analytics (per period / category / expense type)
+    path('analytics/spend/', views.spend_analytics, name='spend-analytics'),
 ]
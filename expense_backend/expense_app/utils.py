@@ -2,13 +2,25 @@
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
-def send_realtime_notification(user, message):
+def send_realtime_notification(user, message, notification_id=None):
     channel_layer = get_channel_layer()
     group_name = f"user_{user.id}"
     async_to_sync(channel_layer.group_send)(
         group_name,
         {
             "type": "send_notification",
+            "id": notification_id,
             "message": message,
         }
     )
+
+
+def send_unread_count(user_id, unread):
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        f"user_{user_id}",
+        {
+            "type": "unread_count",
+            "unread": unread,
+        }
+    )
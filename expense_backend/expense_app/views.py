@@ -7,8 +7,9 @@ from django.db.models.functions import TruncDate
 
 from django.db import transaction as db_transaction
 from django.contrib.auth import logout
-from django.db.models import Sum, F, FloatField
+from django.db.models import DateField, Sum, F, FloatField, Prefetch
 from django.shortcuts import get_object_or_404
+from django.core.exceptions import ValidationError
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.permissions import AllowAny
@@ -17,7 +18,9 @@ from rest_framework.decorators import parser_classes  # ✅ this is the missing
 from django.utils.timezone import datetime,now,make_aware
 from rest_framework import viewsets
 from datetime import date
+import io
 import json
+import logging
 
 from .models import *
 from .serializers import *
@@ -27,16 +30,45 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from django.utils import timezone
 from expense_app.utils import send_realtime_notification
+from .response_cache import cached_response
+from .purge import purge_orders_by_date_user
+from .order_grid import save_day_grid
+from .db_router import read_from_replica
+from .expense_import import import_expenses
+from .settlement import period_bounds, settle_period
+from .ledger import user_balance
+from .notification_retention import delete_in_batches
+from .notifications import mark_read, notify, reconcile_unread, unread_count
+from .row_encoders import encode_expenses, encode_order_items, encode_orders, wants_native
+from .pagination import OptionalPageNumberPagination
+from .reports import (
+    PERIODS, OrderItemReport, combined_daily_totals, category_spend_trend,
+    expense_type_spend_trend, top_items_per_category,
+)
 
 from dateutil import parser
 from .serializers import MyTokenObtainPairSerializer
 # In views.py
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
+from .metrics import request_metrics
+
+logger = logging.getLogger(__name__)
 
 def home_view(request):
     return JsonResponse({'message': 'Expense App Backend Running'})
 
 
+# Request metrics (Prometheus text format, admins only)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def metrics_view(request):
+    return HttpResponse(
+        request_metrics.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
 # Authentication View
 
 @api_view(['POST'])
@@ -139,9 +171,10 @@ def user_logout(request):
 @permission_classes([IsAuthenticated, IsAdminUser])
 def role_list_create(request):
     if request.method == 'GET':
-        roles = Role.objects.all()
-        serializer = RoleSerializer(roles, many=True)
-        return Response(serializer.data)
+        return cached_response(
+            request, 'roles',
+            lambda: list(RoleSerializer(Role.objects.all(), many=True).data)
+        )
     
     elif request.method == 'POST':
         serializer = RoleSerializer(data=request.data)
@@ -179,9 +212,10 @@ def role_detail(request, pk):
 @permission_classes([IsAuthenticated])
 def category_list_create(request):
     if request.method == 'GET':
-        categories = Category.objects.all()
-        serializer = CategorySerializer(categories, many=True)
-        return Response(serializer.data)
+        return cached_response(
+            request, 'categories',
+            lambda: list(CategorySerializer(Category.objects.all(), many=True).data)
+        )
     
     elif request.method == 'POST':
         if not request.user.role or request.user.role.role_name.lower() != 'admin':
@@ -221,9 +255,10 @@ def category_detail(request, pk):
 @permission_classes([IsAuthenticated])
 def item_list_create(request):
     if request.method == 'GET':
-        items = Item.objects.all()
-        serializer = ItemSerializer(items, many=True)
-        return Response(serializer.data)
+        return cached_response(
+            request, 'items',
+            lambda: list(ItemSerializer(Item.objects.all(), many=True).data)
+        )
 
     elif request.method == 'POST':
         # Allow only admins to create items
@@ -309,8 +344,7 @@ class ItemViewSet(viewsets.ModelViewSet):
 def expense_list_create(request):
     if request.method == 'GET':
         expenses = Expense.objects.all().order_by('-date')
-        serializer = ExpenseSerializer(expenses, many=True, context={'request': request})
-        return Response(serializer.data)
+        return Response(encode_expenses(expenses, request))
 
     elif request.method == 'POST':
         serializer = ExpenseSerializer(data=request.data, context={'request': request})
@@ -322,21 +356,13 @@ def expense_list_create(request):
                 # 1) Save the expense itself
                 expense = serializer.save(user=request.user)
 
-                # 2) Notify all admins
+                # 2) Notify all admins (one event fanned out, pushed after commit)
                 admins = User.objects.filter(role__role_name__iexact="admin")
-                for admin in admins:
-                    Notification.objects.create(
-                        user=request.user,
-                        recipient=admin,
-                        message=f"{request.user.username} submitted an expense ₹{expense.amount} on {expense.date}",
-                        is_read=False
-                    )
-
-                    # ✅ Send real-time notification
-                    send_realtime_notification(
-                        admin,
-                        f"{request.user.username} submitted an expense ₹{expense.amount} on {expense.date}"
-                    )
+                notify(
+                    admins, 'expense_submitted',
+                    {'actor': request.user.username, 'amount': str(expense.amount), 'date': str(expense.date)},
+                    actor=request.user, expense=expense,
+                )
 
                 # 3) Create a corresponding Order
                 order = Order.objects.create(
@@ -373,6 +399,29 @@ def expense_list_create(request):
             return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser, FormParser])
+def expense_import(request):
+    """Bulk-import expenses from an uploaded CSV (`file`); `dry_run=true` only validates."""
+    if not request.user.role or request.user.role.role_name.lower() != 'admin':
+        return Response({'error': 'Only admin can import expenses'}, status=status.HTTP_403_FORBIDDEN)
+
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Upload the CSV as "file".'}, status=status.HTTP_400_BAD_REQUEST)
+
+    dry_run = request.data.get('dry_run', request.query_params.get('dry_run', ''))
+    dry_run = str(dry_run).lower() in ('1', 'true', 'yes')
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+        report = import_expenses(stream, request.user, dry_run=dry_run)
+    except (ValueError, UnicodeDecodeError) as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(report, status=status.HTTP_200_OK if dry_run or not report['imported'] else status.HTTP_201_CREATED)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def my_expenses(request):
@@ -436,14 +485,10 @@ def expense_detail(request, pk):
 
                 # ✅ Send notification when admin verifies
                 if data.get('is_verified') is True:
-                    Notification.objects.create(
-                        user=request.user,
-                        recipient=expense.user,
-                        message=(
-                            f"Your expense of ₹{expense.amount}"
-                            f" on {expense.date} has been verified"
-                        ),
-                        is_read=False
+                    notify(
+                        [expense.user], 'expense_verified',
+                        {'amount': str(expense.amount), 'date': str(expense.date)},
+                        actor=request.user, expense=expense,
                     )
 
                 # ✅ Correct user for order creation: use expense.user
@@ -499,6 +544,14 @@ def expense_detail(request, pk):
         expense.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
     
+def orders_with_items(queryset=None):
+    """Everything OrderSerializer reads, loaded up front (one query for orders, one for items)."""
+    queryset = Order.objects.all() if queryset is None else queryset
+    return queryset.select_related('created_user').prefetch_related(
+        Prefetch('orderitem_set', queryset=OrderItem.objects.order_by('id'))
+    )
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def order_list_create(request):
@@ -508,8 +561,30 @@ def order_list_create(request):
         else:
             orders = Order.objects.filter(created_user=request.user)
 
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        user = request.query_params.get('user')
+
+        try:
+            # Business days (BUSINESS_TIME_ZONE) as half-open datetime bounds, so the index is used
+            if start_date:
+                day = DateField().to_python(start_date)
+                orders = orders.filter(created_date__gte=period_bounds(day, day)[0])
+            if end_date:
+                day = DateField().to_python(end_date)
+                orders = orders.filter(created_date__lt=period_bounds(day, day)[1])
+            if user:
+                orders = orders.filter(created_user__username=user)
+            orders = orders.order_by('id')
+
+            # ?page= -> paginated serializer output; otherwise the full list through the row encoders
+            paginator = OptionalPageNumberPagination()
+            page = paginator.paginate_queryset(orders_with_items(orders), request)
+            if page is not None:
+                return paginator.get_paginated_response(OrderSerializer(page, many=True).data)
+            return Response(encode_orders(orders, wants_native(request)))
+        except ValidationError as e:
+            return Response({'error': e.messages}, status=400)
 
     elif request.method == 'POST':
         try:
@@ -532,7 +607,7 @@ def order_list_create(request):
                             if timezone.is_naive(added_date):
                                 added_date = timezone.make_aware(added_date)
                         except Exception as e:
-                            print(f"Invalid added_date format: {raw_date} — Error: {e}")
+                            logger.info("Invalid added_date format", extra={'added_date': raw_date, 'error': str(e)})
                             return Response({'error': f'Invalid date format: {raw_date}'}, status=400)
                     else:
                         return Response({'error': 'Missing added_date for one of the items.'}, status=400)
@@ -561,7 +636,7 @@ def order_list_create(request):
                 # Recalculate total price after adding all items
                 order.update_total_price()
 
-                serializer = OrderSerializer(order)
+                serializer = OrderSerializer(orders_with_items().get(pk=order.pk))
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         except Exception as e:
@@ -570,8 +645,10 @@ def order_list_create(request):
 @api_view(['GET', 'PUT'])
 @permission_classes([IsAuthenticated])
 def order_detail(request, pk):
+    # PUT edits the items, so it must not work on a prefetched (soon stale) item list
+    queryset = orders_with_items() if request.method == 'GET' else Order.objects.all()
     try:
-        order = Order.objects.get(pk=pk)
+        order = queryset.get(pk=pk)
     except Order.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
     
@@ -594,18 +671,20 @@ def order_detail(request, pk):
                     if item_id and item_id in existing_items:
                         # Update existing item
                         item = existing_items[item_id]
-                        item.count = item_data.get('count', item.count)
+                        item.set_count(item_data.get('count', item.count))
                         item.added_date = timezone.now() 
                         item.save()
                         updated_ids.append(item_id)
                     else:
                         # Create new item
-                        OrderItem.objects.create(
+                        new_item = OrderItem(
                             order=order,
-                            item_id=item_data.get('item'),
-                            count=item_data.get('count', 1),
+                            item=Item.objects.get(id=item_data.get('item')),
                             added_date=timezone.now()
                         )
+                        new_item.price = new_item.item.item_price
+                        new_item.set_count(item_data.get('count', 1))
+                        new_item.save()
                 
                 # Delete items not in request
                 for item_id, item in existing_items.items():
@@ -616,7 +695,7 @@ def order_detail(request, pk):
                 order.update_total_price()
                 order.save()
                 
-                return Response(OrderSerializer(order).data)
+                return Response(OrderSerializer(orders_with_items().get(pk=order.pk)).data)
                 
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -638,8 +717,7 @@ def order_item_list(request):
     """List all order items or create a new order item."""
     if request.method == "GET":
         order_items = OrderItem.objects.all()
-        serializer = OrderItemSerializer(order_items, many=True)
-        return Response(serializer.data)
+        return Response(encode_order_items(order_items, wants_native(request)))
 
     elif request.method == "POST":
         serializer = OrderItemSerializer(data=request.data)
@@ -654,21 +732,52 @@ def order_item_list(request):
 
             order = get_object_or_404(Order, id=order_id)
             item = get_object_or_404(Item, id=item_id)
-            count = validated.get("count", 1)
             added_date = validated.get("added_date", timezone.now())
 
-            order_item = OrderItem.objects.create(
+            order_item = OrderItem(
                 order=order,
                 item=item,
-                count=count,
-                added_date=added_date
+                added_date=added_date,
+                price=item.item_price
             )
+            order_item.set_count(request.data.get("count", 1))
+            order_item.save()
             order.update_total_price()
 
             return Response(OrderItemSerializer(order_item).data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def order_items_day(request):
+    """Replace a user's whole morning/evening grid for one day in a single transaction."""
+    serializer = DayGridSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+
+    user = request.user
+    username = data.get('user')
+    if username and username != user.username:
+        if not (user.role and user.role.role_name.lower() == 'admin'):
+            return Response(
+                {"error": "Only admins can edit another user's orders."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        user = get_object_or_404(User, username=username)
+
+    lines = {line['item']: (line['morning_count'], line['evening_count']) for line in data['items']}
+    result = save_day_grid(user, data['date'], lines)
+
+    day_items = OrderItem.objects.filter(order__created_user=user, local_date=data['date']).order_by('id')
+    return Response({
+        'date': data['date'],
+        'user': user.username,
+        **result,
+        'items': encode_order_items(day_items, wants_native(request)),
+    })
+
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def order_item_detail(request, pk):
@@ -690,16 +799,21 @@ def order_item_detail(request, pk):
 
     elif request.method in ["PUT", "PATCH"]:
         try:
-            new_count = int(request.data.get("count", 0))
-            order_item.morning_count = new_count // 2
-            order_item.evening_count = new_count - order_item.morning_count
+            order_item.set_count(request.data.get("count", 0))
 
             if "item" in request.data:
-                order_item.item_id = request.data["item"]
+                item = Item.objects.filter(id=request.data["item"]).first()
+                if item is None:
+                    return Response({"error": "Invalid item ID"}, status=status.HTTP_400_BAD_REQUEST)
+                # The line is billed at the new item's current price
+                order_item.item = item
+                order_item.price = item.item_price
             if "added_date" in request.data:
                 order_item.added_date = request.data["added_date"]
 
             order_item.save()
+            # total_count / line_total are computed by the database on UPDATE
+            order_item.refresh_from_db(fields=['total_count', 'line_total'])
             order_item.order.update_total_price()
             return Response(OrderItemSerializer(order_item).data)
 
@@ -751,38 +865,77 @@ def transaction_detail(request, pk):
         transaction.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def transaction_settle(request):
+    """Run the period settlement (see settlement.settle_period); rerunning a period is safe."""
+    if not request.user.role or request.user.role.role_name.lower() != 'admin':
+        return Response({'error': 'Only admin can run settlements'}, status=status.HTTP_403_FORBIDDEN)
+
+    serializer = SettlementSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+
+    summary = settle_period(data['start_date'], data['end_date'], users=data.get('user'), dry_run=data['dry_run'])
+    created = summary['settlements_created'] and not data['dry_run']
+    return Response(summary, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def balance_view(request):
+    """
+    Running balance from the ledger (positive: the user is owed money), plus the
+    latest `entries` (default 0, max 100) ledger entries. Admins may pass ?user=<username>.
+    """
+    user = request.user
+    username = request.query_params.get('user')
+    if username and username != user.username:
+        if not (user.role and user.role.role_name.lower() == 'admin'):
+            return Response({"error": "Only admins can view another user's balance."}, status=status.HTTP_403_FORBIDDEN)
+        user = get_object_or_404(User, username=username)
+
+    try:
+        limit = min(max(int(request.query_params.get('entries', 0)), 0), 100)
+    except ValueError:
+        limit = 0
+
+    data = {'user': user.username, 'balance': user_balance(user)}
+    if limit:
+        entries = LedgerEntry.objects.filter(user=user).order_by('-id')[:limit]
+        data['entries'] = LedgerEntrySerializer(entries, many=True).data
+    return Response(data)
+
 # Notification Views
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def notification_list(request):
-    notifications = Notification.objects.filter(recipient=request.user).order_by('-created_date')
+    notifications = Notification.objects.filter(recipient=request.user).select_related('event').order_by('-created_date')
     serializer = NotificationSerializer(notifications, many=True)
-    unread_count = notifications.filter(is_read=False).count()
 
     return Response({
-        "unread_count": unread_count,
+        "unread_count": unread_count(request.user),
         "notifications": serializer.data  # ✅ send as list under key
     })
 
 @api_view(['GET', 'PATCH'])
 @permission_classes([IsAuthenticated])
 def notification_detail(request, pk):
-    notification = get_object_or_404(Notification, pk=pk, recipient=request.user)
+    notification = get_object_or_404(Notification.objects.select_related('event'), pk=pk, recipient=request.user)
 
     if request.method == 'GET':
         serializer = NotificationSerializer(notification)
         return Response(serializer.data)
     
     elif request.method == 'PATCH':
-        notification.is_read = True
-        notification.save()
+        mark_read(request.user, notification.pk)
         return Response({'status': 'notification marked as read'})
 
 @api_view(['PATCH'])
 @permission_classes([IsAuthenticated])
 def mark_all_notifications_read(request):
-    Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+    mark_read(request.user)
     return Response({"detail": "All notifications marked as read"})
 
 def send_realtime_notification(user, message):
@@ -801,7 +954,9 @@ def send_realtime_notification(user, message):
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def clear_all_notifications(request):
-    Notification.objects.filter(recipient=request.user).delete()
+    # Batched, so clearing a large inbox doesn't lock the table in one long DELETE
+    delete_in_batches(Notification.objects.filter(recipient=request.user))
+    reconcile_unread([request.user.id])
     return Response({"detail": "All notifications cleared"}, status=204)
 
 
@@ -810,118 +965,117 @@ def clear_all_notifications(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def daily_combined_totals(request):
-
-    orderitem_totals = (
-        OrderItem.objects
-        .annotate(date=TruncDate('added_date'))
-        .values('date')
-        .annotate(order_total=Sum(F('item__item_price') * F('count')))
-        .order_by('date')
-    )
-    print("Regular expense",orderitem_totals)
-
-    expense_totals = (
-        TransactionOrder.objects
-        .filter(expense__isnull=False)
-        .annotate(date=TruncDate('created_date'))
-        .values('date')
-        .annotate(expense_total=Sum('expense__amount'))  
-        .order_by('date')
-    )
-
-    print("Regular expense",expense_totals)
-
-    # === Merge Both Results ===
-    totals_by_date = {}
-
-    for entry in orderitem_totals:
-        date_str = entry['date'].strftime('%Y-%m-%d')
-        totals_by_date.setdefault(date_str, {'order_total': 0, 'expense_total': 0})
-        totals_by_date[date_str]['order_total'] = entry['order_total']
-
-    for entry in expense_totals:
-        date_str = entry['date'].strftime('%Y-%m-%d')
-        totals_by_date.setdefault(date_str, {'order_total': 0, 'expense_total': 0})
-        totals_by_date[date_str]['expense_total'] = entry['expense_total']
-
-    # Convert to list for response
     result = [
         {
-            'date': date,
-            'order_total': round(values['order_total'] or 0, 2),
-            'expense_total': round(values['expense_total'] or 0, 2),
-            'combined_total': round((values['order_total'] or 0) + (values['expense_total'] or 0), 2)
+            'date': row.date.strftime('%Y-%m-%d'),
+            'order_total': row.order_total,
+            'expense_total': row.expense_total,
+            'combined_total': row.combined_total
         }
-        for date, values in sorted(totals_by_date.items())
+        for row in combined_daily_totals()
     ]
 
     return Response(result)
 
 
-# @api_view(['GET'])
-# @permission_classes([IsAuthenticated])
-# def daily_orderitem_summary(request):
-#     # Only include orders with calculated_price > 0
-#     orderitems = OrderItem.objects.filter(
-#         order__calculated_price__gt=0
-#     ).annotate(
-#         order_date=F('added_date__date'),
-#         username=F('order__created_user__username'),
-#     )
-
-#     summary = {}
-#     for item in orderitems:
-#         date_str = item.added_date.date().isoformat()
-#         user = item.order.created_user.username
-
-#         key = (date_str, user)
-#         if key not in summary:
-#             summary[key] = {
-#                 "date": date_str,
-#                 "user": user,
-#                 "total_count": 0,
-#                 "total_amount": 0.0,
-#             }
-
-#         summary[key]["total_count"] += item.count
-#         summary[key]["total_amount"] += item.item.item_price * item.count
-
-#     # Sort by most recent date
-#     response_data = sorted(summary.values(), key=lambda x: (x['date'], x['user']), reverse=True)
-#     return Response(response_data)
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def daily_orderitem_summary(request):
-    orderitems = OrderItem.objects.filter(
-        order__calculated_price__gt=0
-    ).annotate(
-        order_date=F('added_date__date'),
-        username=F('order__created_user__username'),
+    rows = (
+        OrderItemReport()
+        .filter(order__calculated_price__gt=0)
+        .group_by('day', 'user')
+        .measure('total_count', 'total_amount', 'order_id')
+        .newest_first()
+        .rows()
     )
 
-    summary = {}
-    for item in orderitems:
-        date_str = item.added_date.date().isoformat()
-        user = item.order.created_user.username
-        key = (date_str, user)
-
-        if key not in summary:
-            summary[key] = {
-                "date": date_str,
-                "user": user,
-                "total_count": 0,
-                "total_amount": 0.0,
-                "order_id": item.order.id  # ✅ include order ID here
-            }
+    response_data = [
+        {
+            "date": row.date.isoformat(),
+            "user": row.user,
+            "total_count": row.total_count,
+            "total_amount": row.total_amount,
+            "order_id": row.order_id  # ✅ include order ID here
+        }
+        for row in rows
+    ]
+    return Response(response_data)
 
-        summary[key]["total_count"] += item.count
-        summary[key]["total_amount"] += item.item.item_price * item.count
 
-    response_data = sorted(summary.values(), key=lambda x: (x['date'], x['user']), reverse=True)
-    return Response(response_data)
 
+# Spend analytics
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+def spend_analytics(request):
+    params = request.query_params
+    period = params.get('period', 'month')
+    if period not in PERIODS:
+        return Response({'error': f'period must be one of: {", ".join(PERIODS)}'}, status=400)
+    try:
+        top = int(params.get('top', 5))
+        category = int(params['category']) if params.get('category') else None
+        if top < 0 or (category is not None and category < 0):
+            raise ValueError
+    except ValueError:
+        return Response({'error': 'top and category must be non-negative integers'}, status=400)
+
+    filters = {
+        'start_date': params.get('start_date'),
+        'end_date': params.get('end_date'),
+        'user': params.get('user'),
+    }
+    try:
+        report = OrderItemReport().filter(category=category, **filters)
+        categories = [
+            {
+                'period': row['period'].isoformat(),
+                'category_id': row['category'],
+                'category_name': row['category_label'],
+                'total': row['total'],
+                'running_total': row['running_total'],
+                'previous_total': row['previous_total'],
+                'change': row['change'],
+            }
+            for row in category_spend_trend(report, period)
+        ]
+        expense_types = [
+            {
+                'period': row['period'].isoformat(),
+                'expense_type': row['expense_type'],
+                'total': row['total'],
+                'running_total': row['running_total'],
+                'previous_total': row['previous_total'],
+                'change': row['change'],
+            }
+            for row in expense_type_spend_trend(period, **filters)
+        ]
+        top_items = [
+            {
+                'category_id': row['category'],
+                'category_name': row['category_label'],
+                'item_id': row['item'],
+                'item_name': row['item_label'],
+                'count': row['total_count'],
+                'total': row['total'],
+                'rank': row['rank'],
+            }
+            for row in top_items_per_category(report, top)
+        ]
+    except ValidationError as e:
+        return Response({'error': e.messages}, status=400)
+
+    return Response({
+        'period': period,
+        'categories': categories,
+        'expense_types': expense_types,
+        'top_items': top_items,
+    })
 
 
 @api_view(['GET'])
@@ -936,7 +1090,7 @@ def orders_by_date(request):
     try:
         user = User.objects.get(username=username)
         order_items = OrderItem.objects.filter(
-            added_date__date=date,
+            local_date=date,
             order__created_user=user
         ).select_related('item', 'order') 
 
@@ -957,16 +1111,14 @@ def delete_orders_by_date_user(request):
     if not date or not username:
         return Response({'error': 'Missing date or username'}, status=400)
 
-    try:
-        orders_to_delete = Order.objects.filter(
-            created_user__username=username,
-            orderitem__added_date__date=date
-        ).distinct()
+    dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
 
-        count = orders_to_delete.count()
-        orders_to_delete.delete()
+    try:
+        counts = purge_orders_by_date_user(username, date, dry_run=dry_run)
 
-        return Response({'message': f'Deleted {count} order(s).'}, status=200)
+        if dry_run:
+            return Response({'message': f'Would delete {counts["orders"]} order(s).', 'counts': counts}, status=200)
+        return Response({'message': f'Deleted {counts["orders"]} order(s).', 'counts': counts}, status=200)
 
     except Exception as e:
         return Response({'error': str(e)}, status=500)
@@ -974,36 +1126,10 @@ def delete_orders_by_date_user(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def order_items_grouped_by_date(request):
     # ✅ Allow ALL users to see ALL orders
-    order_items = OrderItem.objects.all()
-
-    # Filters
-    start_date = request.query_params.get('start_date')
-    end_date = request.query_params.get('end_date')
-    month = request.query_params.get('month')
-    user = request.query_params.get('user')
-    item_name = request.query_params.get('item_name')
-    date = request.query_params.get('date')
-
-    if start_date:
-        order_items = order_items.filter(added_date__gte=start_date)
-    if end_date:
-        order_items = order_items.filter(added_date__lte=end_date)
-    if month:
-        try:
-            year = int(month[:4])
-            month_num = int(month[5:])
-            order_items = order_items.filter(added_date__year=year, added_date__month=month_num)
-        except (ValueError, IndexError):
-            pass
-
-    if user:
-        order_items = order_items.filter(order__created_user__username=user)
-    if item_name:
-        order_items = order_items.filter(item__item_name=item_name)
-    if date:
-        order_items = order_items.filter(added_date__date=date)
+    params = request.query_params
 
     # Pagination
     try:
@@ -1012,45 +1138,50 @@ def order_items_grouped_by_date(request):
     except ValueError:
         page, page_size = 1, 10
 
-    dates = order_items.dates('added_date', 'day').order_by('-added_date')
-    total_count = dates.count()
-    total_pages = (total_count + page_size - 1) // page_size
-
-    start = (page - 1) * page_size
-    end = start + page_size
-    paginated_dates = dates[start:end]
-
-    grouped_data = {}
+    try:
+        report = OrderItemReport().filter(
+            start_date=params.get('start_date'),
+            end_date=params.get('end_date'),
+            month=params.get('month'),
+            user=params.get('user'),
+            item_name=params.get('item_name'),
+            date=params.get('date'),
+        )
+
+        dates = report.group_by('day').measure().newest_first().values_list()
+        total_count = dates.count()
+        total_pages = (total_count + page_size - 1) // page_size
+
+        start = (page - 1) * page_size
+        end = start + page_size
+        paginated_dates = [row[0] for row in dates[start:end]]
+
+        rows = (
+            report
+            .filter(local_date__in=paginated_dates)
+            .group_by('day', 'item')
+            .measure('total_count', 'total_amount', 'first_id', 'first_user')
+            .newest_first()
+            .rows()
+        ) if paginated_dates else []
+    except ValidationError as e:
+        # Malformed dates reach the database lookups as raw strings
+        return Response({'error': e.messages}, status=400)
+
+    grouped_data = {date.strftime('%Y-%m-%d'): [] for date in paginated_dates}
     grand_total = 0
 
-    for date in paginated_dates:
-        date_str = date.strftime('%Y-%m-%d')
-        items = order_items.filter(added_date__date=date).select_related('item', 'order__created_user')
-
-        date_items = {}
-        date_total = 0
-
-        for item in items:
-            key = item.item.id
-
-            if key not in date_items:
-                date_items[key] = {
-                    'id': item.id,  
-                    'item_id': item.item.id,
-                    'item_name': item.item.item_name,
-                    'price': float(item.item.item_price),
-                    'count': 0,
-                    'total': 0,
-                    'user': item.order.created_user.username
-                }
-
-            date_items[key]['count'] += item.count
-            item_total = item.count * item.item.item_price
-            date_items[key]['total'] += item_total
-            date_total += item_total
-
-        grouped_data[date_str] = list(date_items.values())
-        grand_total += date_total
+    for row in rows:
+        grouped_data[row.date.strftime('%Y-%m-%d')].append({
+            'id': row.first_id,
+            'item_id': row.item_id,
+            'item_name': row.item_name,
+            'price': row.price,
+            'count': row.total_count,
+            'total': row.total_amount,
+            'user': row.first_user
+        })
+        grand_total += row.total_amount
 
     return Response({
         'results': grouped_data,
@@ -1061,7 +1192,27 @@ def order_items_grouped_by_date(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def available_dates(request):
-    # ✅ Show all dates, no matter the user
-    dates = OrderItem.objects.dates('added_date', 'day').order_by('-added_date')
-    return Response([date.strftime('%Y-%m-%d') for date in dates])
+    # ✅ Show all dates, no matter the user (optionally narrowed by user / range)
+    def build():
+        days = OrderItemDay.objects.all()
+
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        user = request.query_params.get('user')
+
+        if start_date:
+            days = days.filter(date__gte=start_date)
+        if end_date:
+            days = days.filter(date__lte=end_date)
+        if user:
+            days = days.filter(user__username=user)
+
+        dates = days.values_list('date', flat=True).distinct().order_by('-date')
+        return [date.strftime('%Y-%m-%d') for date in dates]
+
+    try:
+        return cached_response(request, 'available-dates', build)
+    except ValidationError as e:
+        return Response({'error': e.messages}, status=400)
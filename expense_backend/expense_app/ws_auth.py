@@ -0,0 +1,109 @@
+# expense_app/ws_auth.py
+"""
+SimpleJWT authentication for WebSocket connections.
+
+The SPA has no session, so the access token travels with the handshake,
+either as ?token=<jwt> or as the subprotocol pair ["bearer", "<jwt>"] (the
+consumer then accepts with the "bearer" subprotocol). The signature and
+expiry are checked locally; the user's id, active flag and role are cached
+under the token's jti until the token expires (never the whole row), so
+reconnects cost no DB query. Saving or deleting a user drops its cached
+entries (per-user cache version).
+
+scope["auth_expires"] is the token's expiry (a UNIX timestamp), at which
+the consumer closes the socket.
+"""
+import time
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import Role, User
+from .response_cache import bump_version, get_version
+
+SUBPROTOCOL = 'bearer'
+
+
+def _user_namespace(user_id):
+    return f"ws-auth-user-{user_id}"
+
+
+def invalidate_user(user_id):
+    bump_version(_user_namespace(user_id))
+
+
+def token_from_scope(scope):
+    """(raw token, subprotocol to accept) from the query string or the offered subprotocols."""
+    protocols = [protocol.strip() for protocol in scope.get('subprotocols') or []]
+    lowered = [protocol.lower() for protocol in protocols]
+    if SUBPROTOCOL in lowered:
+        index = lowered.index(SUBPROTOCOL)
+        if index + 1 < len(protocols):
+            return protocols[index + 1], protocols[index]
+    query = parse_qs(scope.get('query_string', b'').decode())
+    return (query.get('token') or [None])[0], None
+
+
+def user_for_token(raw_token):
+    """(user, expiry timestamp) for a valid access token, else (AnonymousUser, None)."""
+    try:
+        token = AccessToken(raw_token)
+    except TokenError:
+        return AnonymousUser(), None
+
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    expires = token.get('exp')
+    if user_id is None or expires is None:
+        return AnonymousUser(), None
+    version = get_version(_user_namespace(user_id))
+    key = f"ws-auth:{user_id}:{version}:{token.get(api_settings.JTI_CLAIM)}"
+
+    cached = cache.get(key)
+    if cached is None:
+        user = User.objects.select_related('role').filter(
+            **{api_settings.USER_ID_FIELD: user_id}, is_active=True
+        ).first()
+        if user is None:
+            return AnonymousUser(), None
+        cached = _cached_fields(user)
+        cache.set(key, cached, timeout=max(int(expires - time.time()), 1))
+    return _user_from(cached), expires
+
+
+def _cached_fields(user):
+    # Only what the consumers use; the password hash and profile never go to the cache
+    return {
+        'id': user.pk,
+        'is_active': user.is_active,
+        'role_id': user.role_id,
+        'role_name': user.role.role_name if user.role else None,
+    }
+
+
+def _user_from(fields):
+    """Unsaved User carrying the cached fields; enough for filters on the user and role checks."""
+    user = User(id=fields['id'], is_active=fields['is_active'], role_id=fields['role_id'])
+    if fields['role_id'] is not None:
+        user.role = Role(id=fields['role_id'], role_name=fields['role_name'])
+    return user
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Populates scope["user"] from a SimpleJWT access token (AnonymousUser without a valid one)."""
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope)
+        raw_token, subprotocol = token_from_scope(scope)
+        user, expires = AnonymousUser(), None
+        if raw_token:
+            user, expires = await database_sync_to_async(user_for_token)(raw_token)
+        scope['user'] = user
+        scope['auth_expires'] = expires
+        scope['auth_subprotocol'] = subprotocol
+        return await super().__call__(scope, receive, send)
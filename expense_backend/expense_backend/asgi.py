@@ -12,15 +12,18 @@ import os
 import django
 from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
-from channels.auth import AuthMiddlewareStack
-from expense_app.routing import websocket_urlpatterns  # 👈 must create this
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expense_backend.settings')
 django.setup()
 
+# These import models, so they load after the app registry
+from expense_app.routing import websocket_urlpatterns  # 👈 must create this
+from expense_app.ws_auth import JWTAuthMiddleware
+
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
-    "websocket": AuthMiddlewareStack(
+    # The SPA authenticates with SimpleJWT access tokens, not sessions
+    "websocket": JWTAuthMiddleware(
         URLRouter(websocket_urlpatterns)
     ),
 })
@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 import dj_database_url
@@ -52,6 +53,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'expense_app.middleware.RequestMetricsMiddleware',
+    'expense_app.middleware.ReplicaStickinessMiddleware',
 ]
 
 
@@ -100,13 +103,61 @@ WSGI_APPLICATION = 'expense_backend.wsgi.application'
 DATABASES = {}
 
 if os.environ.get("DATABASE_URL"):
-    DATABASES["default"] = dj_database_url.config(conn_max_age=600, ssl_require=True)
+    # psycopg 3 connection pool (Django 5.1+): one pool per process shared by every
+    # daphne/gunicorn thread instead of a connection per thread. DB_POOL=false falls
+    # back to persistent per-thread connections (CONN_MAX_AGE).
+    DB_POOL = os.environ.get("DB_POOL", "true").lower() in ("1", "true", "yes")
+    DATABASES["default"] = dj_database_url.config(
+        conn_max_age=0 if DB_POOL else int(os.environ.get("DB_CONN_MAX_AGE", 600)),
+        conn_health_checks=True,  # with the pool: psycopg_pool checks connections on checkout
+        ssl_require=True,
+    )
+    if DB_POOL:
+        DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),  # wait for a free connection
+            "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+            "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+        }
 else:
     # Local development using SQLite
     DATABASES["default"] = {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
     }
+    # SQLITE_PROFILE=wal (default): WAL journal so readers don't block the writer,
+    # IMMEDIATE write transactions + busy timeout instead of "database is locked",
+    # and persistent connections. SQLITE_PROFILE=default keeps Django's defaults.
+    if os.environ.get("SQLITE_PROFILE", "wal") == "wal":
+        DATABASES["default"]["CONN_MAX_AGE"] = int(os.environ.get("DB_CONN_MAX_AGE", 600))
+        DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+        DATABASES["default"]["OPTIONS"] = {
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA cache_size=-20000;"
+                "PRAGMA temp_store=MEMORY;"
+                "PRAGMA mmap_size=134217728;"
+            ),
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        }
+
+# Read replica for the reporting endpoints (expense_app.db_router). Any dj-database-url
+# URL works, e.g. a second local SQLite file: DATABASE_REPLICA_URL=sqlite:////abs/path/replica.sqlite3
+if os.environ.get("DATABASE_REPLICA_URL"):
+    DATABASES["replica"] = dj_database_url.parse(
+        os.environ["DATABASE_REPLICA_URL"],
+        conn_max_age=int(os.environ.get("DB_CONN_MAX_AGE", 600)),
+        conn_health_checks=True,
+    )
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+REPLICA_DATABASE_ALIAS = "replica" if "replica" in DATABASES else None
+# After a write, the user's reports read from the primary for this long
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 10))
+DATABASE_ROUTERS = ["expense_app.db_router.ReplicaRouter"]
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -124,6 +175,8 @@ AUTHENTICATION_BACKENDS = [
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
+# Business days (reports, date filters, available dates) are counted in this zone, not UTC
+BUSINESS_TIME_ZONE = os.environ.get('BUSINESS_TIME_ZONE', 'Asia/Kolkata')
 USE_I18N = True
 USE_TZ = True
 
@@ -149,8 +202,26 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # application/msgpack for bulk sync clients, picked through Accept / Content-Type
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'expense_app.renderers.MessagePackRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'expense_app.renderers.MessagePackParser',
+    ),
 }
 
+# Fail loudly when a guarded serializer (expense_app.query_guard) lazy-loads a relation.
+# On by default in DEBUG and under `manage.py test`.
+SERIALIZER_QUERY_GUARD = os.environ.get(
+    "SERIALIZER_QUERY_GUARD", str(DEBUG or 'test' in sys.argv)
+).lower() in ("1", "true", "yes")
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
@@ -169,14 +240,81 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Redis shared by the cache and the channel layer
+REDIS_URL = os.environ.get("REDIS_URL", "redis://127.0.0.1:6379")
+TESTING = "test" in sys.argv or "pytest" in sys.modules
+
+# Cache
+# Response-cache versions, replica stickiness and WebSocket auth invalidation must be
+# seen by every worker, so the cache is always the shared Redis; tests use locmem
+if TESTING:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "expense-cache",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "expense",
+        }
+    }
+
+# Cached GET responses for reference data (categories, items, roles)
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 60 * 60))
+
+# Notification retention (manage.py prune_notifications, run periodically)
+NOTIFICATION_ARCHIVE_READ_AFTER_DAYS = int(os.environ.get("NOTIFICATION_ARCHIVE_READ_AFTER_DAYS", 30))
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_RETENTION_DAYS", 365))
+NOTIFICATION_MAX_PER_RECIPIENT = int(os.environ.get("NOTIFICATION_MAX_PER_RECIPIENT", 500))
+NOTIFICATION_PURGE_BATCH_SIZE = int(os.environ.get("NOTIFICATION_PURGE_BATCH_SIZE", 1000))
+
+# WebSocket replay of missed notifications: rows per frame, and the most a reconnect replays
+NOTIFICATION_REPLAY_BATCH_SIZE = int(os.environ.get("NOTIFICATION_REPLAY_BATCH_SIZE", 50))
+NOTIFICATION_REPLAY_MAX = int(os.environ.get("NOTIFICATION_REPLAY_MAX", 500))
+
+# Logging (structured JSON; debug/info records from the app are sampled)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "sampling": {
+            "()": "expense_app.logging_utils.SamplingFilter",
+            "rate": float(os.environ.get("LOG_SAMPLE_RATE", 1.0)),
+        },
+    },
+    "formatters": {
+        "json": {"()": "expense_app.logging_utils.JsonFormatter"},
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "json",
+            "filters": ["sampling"],
+        },
+    },
+    "loggers": {
+        "expense_app": {
+            "handlers": ["console"],
+            "level": os.environ.get("APP_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
 # Channels (WebSocket) Layer
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
         "CONFIG": {
-            "hosts": [("127.0.0.1", 6379)],
+            "hosts": [REDIS_URL],
         },
     },
 }
+if TESTING:
+    CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
 
 
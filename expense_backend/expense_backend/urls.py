@@ -2,11 +2,12 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from expense_app.views import home_view
+from expense_app.views import home_view, metrics_view
 
 urlpatterns = [
     path('', home_view),  # 👈 this handles "/"
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/', include('expense_app.urls')),  # Or whatever your app is
 ]
 